@@ -5,15 +5,17 @@ Excel出力モジュール
 Excel生成の基本機能、カスタムヘッダー設定、データ変換、スタイル適用などの機能が含まれます。
 """
 
+import io
 import os
 import logging
 import tempfile
 from pathlib import Path
-from typing import List, Dict, Any, Optional, BinaryIO
+from typing import List, Dict, Any, Optional, BinaryIO, Tuple
 from datetime import datetime
 
 import openpyxl
 # スタイル関連のインポートを追加
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Alignment
 from openpyxl.utils import get_column_letter
 
@@ -104,43 +106,125 @@ class ExcelExporter(ExcelExporterProtocol):
             ExcelExportError: Excel出力処理でエラーが発生した場合
         """
         self.logger.info(f"Excelバイナリデータ生成開始: 結果数={len(results)}")
-        
-        # 新しいワークブックを作成
-        workbook = openpyxl.Workbook()
-        sheet = workbook.active
-        sheet.title = "スタイルタイトル"
-        
-        # ヘッダーの設定
-        self._set_headers(sheet)
-        
-        # データの追加
-        self._add_data(sheet, results)
-        
-        # 列幅の自動調整
-        self._adjust_column_widths(sheet)
-        
-        # 一時ファイルに保存してバイナリデータを取得
+
+        # 書き込み専用モードのワークブックを作成（行単位でXMLへ直列化するため、
+        # 行数分のセルオブジェクトをメモリに保持しない）
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet = workbook.create_sheet("スタイルタイトル")
+
+        # ヘッダー行と全データ行を値のタプルとして構築
+        headers = self.config.headers
+        header_row = [headers.get(get_column_letter(col), "") for col in range(1, 10)]
+        rows = [self._build_row(result) for result in results]
+
+        # 列幅・行高さは書き込み開始前に設定する必要がある
+        self._set_streaming_dimensions(sheet, header_row, rows)
+
+        sheet.append(header_row)
+        wrap_alignment = Alignment(wrap_text=True, vertical='top')
+        for row in rows:
+            cells = list(row)
+            # H列（ハッシュタグ）のみ折り返し表示を設定
+            hashtag_cell = WriteOnlyCell(sheet, value=row[7])
+            hashtag_cell.alignment = wrap_alignment
+            cells[7] = hashtag_cell
+            sheet.append(cells)
+
+        # 一時ファイルを経由せず、メモリ上のバッファに直接保存
         try:
-            with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as tmp:
-                tmp_path = tmp.name
-            
-            workbook.save(tmp_path)
-            
-            with open(tmp_path, 'rb') as f:
-                binary_data = f.read()
-            
-            # 一時ファイルを削除
-            os.unlink(tmp_path)
-            
+            buffer = io.BytesIO()
+            workbook.save(buffer)
+            binary_data = buffer.getvalue()
+
             self.logger.info(f"Excelバイナリデータを生成しました: {len(binary_data)} バイト")
             return binary_data
-            
+
         except Exception as e:
             self.logger.error(f"Excelバイナリデータの生成エラー: {e}")
-            # 一時ファイルが残っていたら削除
-            if 'tmp_path' in locals() and os.path.exists(tmp_path):
-                os.unlink(tmp_path)
             raise ExcelExportError(f"Excelバイナリデータの生成に失敗しました: {str(e)}") from e
+
+    def _build_row(self, result: ProcessResultProtocol) -> Tuple[str, ...]:
+        """
+        1件の処理結果をExcelの1行分（A〜I列）の値に変換します。
+
+        Args:
+            result: 処理結果（辞書またはオブジェクト）
+
+        Returns:
+            A〜I列の値のタプル
+        """
+        try:
+            if isinstance(result, dict):
+                stylist = result.get('selected_stylist', {})
+                coupon = result.get('selected_coupon', {})
+                template = result.get('selected_template', {})
+                stylist_name = stylist.get('name', '') if isinstance(stylist, dict) else getattr(stylist, 'name', '')
+                coupon_name = coupon.get('name', '') if isinstance(coupon, dict) else getattr(coupon, 'name', '')
+                comment = template.get('comment', '') if isinstance(template, dict) else getattr(template, 'comment', '')
+                title = template.get('title', '') if isinstance(template, dict) else getattr(template, 'title', '')
+            else:
+                stylist_name = getattr(result.selected_stylist, 'name', '')
+                coupon_name = getattr(result.selected_coupon, 'name', '')
+                comment = getattr(result.selected_template, 'comment', '')
+                title = getattr(result.selected_template, 'title', '')
+        except Exception as e:
+            self.logger.error(f"Excel行データ構築エラー: {e}")
+            stylist_name = coupon_name = comment = title = "ERROR"
+
+        try:
+            if isinstance(result, dict):
+                attr_analysis = result.get('attribute_analysis', {})
+                template = result.get('selected_template', {})
+                sex = attr_analysis.get('sex', '') if isinstance(attr_analysis, dict) else getattr(attr_analysis, 'sex', '')
+                length = attr_analysis.get('length', '') if isinstance(attr_analysis, dict) else getattr(attr_analysis, 'length', '')
+                menu = template.get('menu', '') if isinstance(template, dict) else getattr(template, 'menu', '')
+                hashtag_str = template.get('hashtag', '') if isinstance(template, dict) else getattr(template, 'hashtag', '')
+                image_name = result.get('image_name', '')
+            else:
+                sex = getattr(result.attribute_analysis, 'sex', '')
+                length = getattr(result.attribute_analysis, 'length', '')
+                menu = getattr(result.selected_template, 'menu', '')
+                hashtag_str = getattr(result.selected_template, 'hashtag', '')
+                image_name = getattr(result, 'image_name', '')
+
+            # ハッシュタグを改行して表示し、最初の5個までに制限
+            hashtags = [tag.strip() for tag in hashtag_str.split(',') if tag.strip()][:5]
+            hashtag_text = '\n'.join(hashtags)
+        except Exception as e:
+            self.logger.error(f"Excel行データ構築エラー2: {e}")
+            sex = length = menu = hashtag_text = image_name = "ERROR"
+
+        return (stylist_name, coupon_name, comment, title, sex, length, menu, hashtag_text, image_name)
+
+    def _set_streaming_dimensions(self, sheet, header_row: List[str], rows: List[Tuple[str, ...]]) -> None:
+        """
+        書き込み専用シートの列幅と行高さを事前計算して設定します。
+
+        Args:
+            sheet: 書き込み専用ワークシート
+            header_row: ヘッダー行の値リスト
+            rows: データ行の値タプルのリスト
+        """
+        for col_index in range(9):
+            column_letter = get_column_letter(col_index + 1)
+            values = [header_row[col_index]] + [row[col_index] for row in rows]
+
+            if column_letter == 'H':
+                # ハッシュタグは改行されるので、各行の最長のハッシュタグの長さを考慮
+                max_length = max((len(tag) for value in values for tag in str(value).split('\n')), default=0)
+                min_width = 15  # ハッシュタグ列の最小幅を大きめに
+            else:
+                max_length = max((len(str(value)) for value in values), default=0)
+                min_width = 10
+
+            adjusted_width = (max_length + 2) * 1.1
+            sheet.column_dimensions[column_letter].width = max(min_width, min(adjusted_width, 50))
+
+        # 行の高さを調整（ハッシュタグの数に応じて）
+        for i, row in enumerate(rows, start=2):
+            hashtag_count = len(str(row[7]).split('\n')) if row[7] else 0
+            row_height = min(15 * hashtag_count, 75)  # 1タグあたり15、最大75
+            sheet.row_dimensions[i].height = max(15, row_height)
     
     def _create_backup(self, file_path: Path) -> Path:
         """
@@ -7,6 +7,8 @@
 
 import logging
 import asyncio
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Dict, Any, Union, Tuple
 
@@ -17,6 +19,12 @@ from ..utils.errors import GeminiAPIError, ImageError, async_with_error_handling
 from ..utils.cache_decorators import cacheable
 
 
+@lru_cache(maxsize=256)
+def _image_digest(path_str: str, mtime: float) -> str:
+    """画像ファイル内容のSHA-256ダイジェストを計算します（パスとmtime単位でメモ化）。"""
+    return hashlib.sha256(Path(path_str).read_bytes()).hexdigest()
+
+
 class ImageAnalyzer:
     """
     画像分析クラス
@@ -38,8 +46,23 @@ class ImageAnalyzer:
         self.gemini_service = gemini_service
         self.cache_manager = cache_manager
         self.use_cache = use_cache
-    
-    @cacheable(lambda self, image_path, *args, **kwargs: f"style_analysis:{image_path.name}")
+
+    def _analysis_cache_key(self, prefix: str, image_path: Path) -> str:
+        """分析結果のキャッシュキーを生成します。
+
+        ファイル名ではなく画像内容のダイジェストをキーにするため、同一画像の
+        リネームや再アップロードでもキャッシュがヒットします。モデル名を含める
+        ことで、モデル変更時には自動的に無効化されます。
+        """
+        try:
+            identity = _image_digest(str(image_path), image_path.stat().st_mtime)
+        except OSError:
+            # ファイルが読めない場合は従来どおりファイル名で代用
+            identity = image_path.name
+        model = getattr(self.gemini_service.config, 'model', '')
+        return f"{prefix}:{identity}:{model}"
+
+    @cacheable(lambda self, image_path, *args, **kwargs: self._analysis_cache_key("style_analysis", image_path))
     @async_with_error_handling(GeminiAPIError, "画像分析に失敗しました")
     async def analyze_image(self, image_path: Path, categories: List[str]) -> Optional[StyleAnalysisProtocol]:
         """
@@ -71,7 +94,7 @@ class ImageAnalyzer:
             self.logger.error(f"予期しないエラー: {str(e)}")
             return None
     
-    @cacheable(lambda self, image_path, *args, **kwargs: f"attribute_analysis:{image_path.name}")
+    @cacheable(lambda self, image_path, *args, **kwargs: self._analysis_cache_key("attribute_analysis", image_path))
     @async_with_error_handling(GeminiAPIError, "属性分析に失敗しました")
     async def analyze_attributes(self, image_path: Path) -> Optional[AttributeAnalysisProtocol]:
         """
@@ -102,6 +125,67 @@ class ImageAnalyzer:
             self.logger.error(f"予期しないエラー: {str(e)}")
             return None
     
+    async def analyze_styles_batch(self, image_paths: List[Path], categories: List[str], batch_size: int = 4, use_cache: Optional[bool] = None) -> List[Optional[StyleAnalysisProtocol]]:
+        """
+        複数画像のスタイル分析をバッチAPI呼び出しで行います。
+
+        画像をbatch_size枚ずつのチャンクに分割し、チャンクごとに1回の
+        マルチ画像リクエストで分析します。キャッシュにヒットした画像は
+        リクエストから除外し、バッチで解析できなかった画像は1枚ずつの
+        分析にフォールバックします。
+
+        Args:
+            image_paths: 画像ファイルのパスリスト
+            categories: カテゴリリスト
+            batch_size: 1リクエストに含める画像の最大数
+            use_cache: キャッシュを使用するかどうか（Noneの場合はインスタンスの設定を使用）
+
+        Returns:
+            入力と同じ順序の分析結果リスト（失敗した画像はNone）
+        """
+        if not image_paths:
+            return []
+
+        should_use_cache = self.use_cache if use_cache is None else use_cache
+        can_cache = should_use_cache and self.cache_manager is not None
+
+        analyses: List[Optional[StyleAnalysisProtocol]] = [None] * len(image_paths)
+
+        # キャッシュヒットした画像はAPIリクエストから除外する
+        pending_indices = []
+        for i, image_path in enumerate(image_paths):
+            cached = self.cache_manager.get(self._analysis_cache_key("style_analysis", image_path)) if can_cache else None
+            if cached is not None:
+                analyses[i] = cached
+            else:
+                pending_indices.append(i)
+
+        # 残りをバッチに分割して並列に分析
+        batch_size = max(1, batch_size)
+        batches = [pending_indices[i:i + batch_size] for i in range(0, len(pending_indices), batch_size)]
+        batch_results = await asyncio.gather(
+            *[self.gemini_service.analyze_images_batch([image_paths[i] for i in batch], categories) for batch in batches],
+            return_exceptions=True
+        )
+
+        for batch, result in zip(batches, batch_results):
+            if isinstance(result, Exception):
+                self.logger.error(f"バッチ分析エラー: {str(result)}")
+                continue
+            for i, analysis in zip(batch, result):
+                analyses[i] = analysis
+
+        # バッチで解析できなかった画像は1枚ずつの分析にフォールバック
+        for i in pending_indices:
+            if analyses[i] is None:
+                self.logger.info(f"バッチ分析に失敗したため個別に分析します: {image_paths[i].name}")
+                analyses[i] = await self.analyze_image(image_paths[i], categories, use_cache=should_use_cache)
+            elif can_cache:
+                # バッチで得た結果もキャッシュに保存し、単体分析と共有する
+                self.cache_manager.set(self._analysis_cache_key("style_analysis", image_paths[i]), analyses[i])
+
+        return analyses
+
     async def analyze_full(self, image_path: Path, categories: List[str], use_cache: Optional[bool] = None) -> Tuple[Optional[StyleAnalysisProtocol], Optional[AttributeAnalysisProtocol]]:
         """
         画像の完全分析（スタイル分析と属性分析）を行います。
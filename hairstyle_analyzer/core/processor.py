@@ -121,15 +121,17 @@ class MainProcessor(MainProcessorProtocol):
             self.progress_callback(current, total, message)
     
     @cacheable(lambda self, image_path, *args, **kwargs: f"process_result:{image_path.name}")
-    async def process_single_image(self, image_path: Path, stylists=None, coupons=None) -> Optional[ProcessResultProtocol]:
+    async def process_single_image(self, image_path: Path, stylists=None, coupons=None, use_cache: Optional[bool] = None, style_analysis: Optional[StyleAnalysisProtocol] = None) -> Optional[ProcessResultProtocol]:
         """
         単一の画像を処理します。
-        
+
         Args:
             image_path: 画像ファイルのパス
             stylists: スタイリスト情報のリスト（オプション）
             coupons: クーポン情報のリスト（オプション）
-            
+            use_cache: キャッシュを使用するかどうか（Noneの場合はインスタンスの設定を使用）
+            style_analysis: バッチ分析などで事前に取得済みのスタイル分析結果（オプション）
+
         Returns:
             処理結果、またはエラー時はNone
             
@@ -146,27 +148,31 @@ class MainProcessor(MainProcessorProtocol):
             # 1. スタイル分析と属性分析を並列実行
             self._update_progress(1, 5, f"スタイル分析中: {image_path.name}")
             categories = self.template_matcher.template_manager.get_all_categories()
-            style_analysis, attribute_analysis = await self.image_analyzer.analyze_full(image_path, categories)
+            if style_analysis is not None:
+                # バッチ分析で取得済みのスタイル分析を再利用し、属性分析のみ実行する
+                attribute_analysis = await self.image_analyzer.analyze_attributes(image_path, use_cache=use_cache)
+            else:
+                style_analysis, attribute_analysis = await self.image_analyzer.analyze_full(image_path, categories, use_cache=use_cache)
             
             if not style_analysis or not attribute_analysis:
                 self.logger.error(f"画像分析に失敗しました: {image_path.name}")
                 return None
             
-            # 2. テンプレートマッチング
-            self._update_progress(2, 5, f"テンプレートマッチング中: {image_path.name}")
-            template, alternative_templates, template_reason = await self._match_template(image_path, style_analysis)
-            
+            # 2-4. テンプレートマッチング・スタイリスト選択・クーポン選択
+            # いずれもスタイル分析結果のみに依存する独立した段階のため、並列に実行する
+            self._update_progress(2, 5, f"テンプレート・スタイリスト・クーポン選択中: {image_path.name}")
+            template_result, stylist_result, coupon_result = await asyncio.gather(
+                self._match_template(image_path, style_analysis),
+                self._select_stylist(image_path, stylists, style_analysis),
+                self._select_coupon(image_path, coupons, style_analysis)
+            )
+            template, alternative_templates, template_reason = template_result
+
             if not template:
                 self.logger.error(f"テンプレートマッチングに失敗しました: {image_path.name}")
                 return None
-            
-            # 3-4. スタイリストとクーポン選択
-            self._update_progress(3, 5, f"スタイリスト選択中: {image_path.name}")
-            stylist_result = await self._select_stylist(image_path, stylists, style_analysis)
+
             selected_stylist, stylist_reason = stylist_result if stylist_result else (None, None)
-            
-            self._update_progress(4, 5, f"クーポン選択中: {image_path.name}")
-            coupon_result = await self._select_coupon(image_path, coupons, style_analysis)
             selected_coupon, coupon_reason = coupon_result if coupon_result else (None, None)
             
             # 5. 処理結果作成
@@ -405,6 +411,9 @@ class MainProcessor(MainProcessorProtocol):
         
         # キャッシュを使用するかどうかの判定
         should_use_cache = self.use_cache if use_cache is None else use_cache
+
+        # バッチ分析用のカテゴリリストを1回だけ取得
+        categories = self.template_matcher.template_manager.get_all_categories()
         
         # 非同期コンテキストマネージャーを使用して進捗を追跡
         async def progress_handler(current, total, message):
@@ -420,9 +429,22 @@ class MainProcessor(MainProcessorProtocol):
                 batch_message = f"バッチ {batch_index + 1}/{batch_count} 処理中"
                 self.logger.info(batch_message)
                 tracker.update(processed_count, batch_message)
-                
+
+                # バッチ内のスタイル分析を1回のマルチ画像リクエストでまとめて実行
+                # （失敗した画像はstyle_analysis=Noneとなり、従来どおり1枚ずつ分析される）
+                try:
+                    batch_styles = await self.image_analyzer.analyze_styles_batch(
+                        batch, categories, batch_size=optimal_batch_size, use_cache=should_use_cache
+                    )
+                except Exception as e:
+                    self.logger.error(f"バッチ分析に失敗したため、1枚ずつ分析します: {str(e)}")
+                    batch_styles = [None] * len(batch)
+
                 # バッチ内の画像を並列処理
-                tasks = [self.process_single_image(image_path, use_cache=should_use_cache) for image_path in batch]
+                tasks = [
+                    self.process_single_image(image_path, use_cache=should_use_cache, style_analysis=batch_styles[i])
+                    for i, image_path in enumerate(batch)
+                ]
                 batch_results = await asyncio.gather(*tasks, return_exceptions=True)
                 
                 # 結果の処理
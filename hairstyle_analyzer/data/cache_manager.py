@@ -6,14 +6,15 @@
 """
 
 import os
-import json
 import time
 import logging
 import hashlib
+import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set, Union, TypeVar, Generic, Callable
 from datetime import datetime, timedelta
 
+import orjson
 from pydantic import ValidationError, BaseModel
 
 from .models import CacheEntry, CacheConfig
@@ -24,17 +25,14 @@ from ..utils.errors import AppError, with_error_handling
 T = TypeVar('T')
 
 
-# カスタムJSONエンコーダ - Pydanticモデルをシリアライズするために使用
-class PydanticJSONEncoder(json.JSONEncoder):
-    """PydanticモデルをJSONシリアライズするためのカスタムエンコーダ"""
-    def default(self, obj):
-        if isinstance(obj, BaseModel):
-            return obj.model_dump()
-        if isinstance(obj, Path):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+# orjsonが直接シリアライズできない型（Pydanticモデルなど）のためのフォールバック
+# （datetimeはorjsonがネイティブに処理する）
+def _orjson_default(obj):
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, Path):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 class CacheManager(CacheManagerProtocol):
@@ -56,6 +54,9 @@ class CacheManager(CacheManagerProtocol):
         self.cache_file_path = Path(cache_file_path)
         self.config = config
         
+        # 書き込みの排他制御（ワーカースレッドからのset呼び出しに備える）
+        self._write_lock = threading.Lock()
+
         # キャッシュデータのロード
         self.cache: Dict[str, CacheEntry] = {}
         self._load_cache()
@@ -72,8 +73,8 @@ class CacheManager(CacheManagerProtocol):
             return
         
         try:
-            with open(self.cache_file_path, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
+            with open(self.cache_file_path, 'rb') as f:
+                cache_data = orjson.loads(f.read())
             
             # キャッシュエントリを構築
             self.cache = {}
@@ -93,7 +94,7 @@ class CacheManager(CacheManagerProtocol):
             # 古いキャッシュエントリをクリーンアップ
             self._cleanup_expired()
             
-        except (json.JSONDecodeError, IOError) as e:
+        except (orjson.JSONDecodeError, IOError) as e:
             self.logger.error(f"キャッシュファイルの読み込みエラー: {e}")
             self.cache = {}
     
@@ -117,8 +118,8 @@ class CacheManager(CacheManagerProtocol):
             
             # 一時ファイルに書き込み
             temp_file = self.cache_file_path.with_suffix('.tmp')
-            with open(temp_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, ensure_ascii=False, indent=2, cls=PydanticJSONEncoder)
+            with open(temp_file, 'wb') as f:
+                f.write(orjson.dumps(cache_data, default=_orjson_default, option=orjson.OPT_INDENT_2))
             
             # 一時ファイルを正規のファイルに置き換え
             if temp_file.exists():
@@ -246,15 +247,17 @@ class CacheManager(CacheManagerProtocol):
             timestamp=time.time(),
             ttl=ttl
         )
-        
-        # キャッシュに追加
-        self.cache[cache_key] = entry
-        
-        # サイズ制限をチェック
-        self._enforce_size_limit()
-        
-        # キャッシュを保存
-        self._save_cache()
+
+        # 複数スレッドからの同時setでファイル書き込みが競合しないようロックする
+        with self._write_lock:
+            # キャッシュに追加
+            self.cache[cache_key] = entry
+
+            # サイズ制限をチェック
+            self._enforce_size_limit()
+
+            # キャッシュを保存
+            self._save_cache()
         
         self.logger.debug(f"キャッシュに追加: {cache_key}")
     
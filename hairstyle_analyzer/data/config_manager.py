@@ -9,6 +9,7 @@ import os
 import yaml
 import logging
 import shutil
+import hashlib
 from pathlib import Path
 from typing import Dict, Any, Optional, Union, List
 from datetime import datetime
@@ -270,6 +271,15 @@ class ConfigManager:
             logging.error(f"APIキーの保存に失敗: {e}")
             raise
     
+    @property
+    def config_hash(self) -> str:
+        """現在の設定内容のダイジェストを取得
+
+        設定内容の変更検出をキャッシュキーとして利用する用途に使います。
+        """
+        dumped = yaml.safe_dump(self._config_dict, sort_keys=True, allow_unicode=True)
+        return hashlib.md5(dumped.encode('utf-8')).hexdigest()
+
     @property
     def app_config(self) -> AppConfig:
         """アプリケーション設定モデルを取得"""
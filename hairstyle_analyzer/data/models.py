@@ -18,6 +18,9 @@ class StyleFeatures(BaseModel):
     styling: str = Field(description="スタイリング方法")
     impression: str = Field(description="全体的な印象")
 
+    class Config:
+        frozen = True
+
 
 class StyleAnalysis(BaseModel):
     """スタイル分析結果を表すモデル"""
@@ -25,12 +28,18 @@ class StyleAnalysis(BaseModel):
     features: StyleFeatures = Field(description="スタイルの特徴")
     keywords: List[str] = Field(default_factory=list, description="スタイルのキーワードリスト")
 
+    class Config:
+        frozen = True
+
 
 class AttributeAnalysis(BaseModel):
     """属性分析結果を表すモデル"""
     sex: str = Field(description="性別（レディース/メンズ）")
     length: str = Field(description="髪の長さ")
 
+    class Config:
+        frozen = True
+
 
 class Template(BaseModel):
     """テンプレートを表すモデル"""
@@ -51,6 +60,9 @@ class Template(BaseModel):
             return []
         return [tag.strip() for tag in self.hashtag.split(',') if tag.strip()]
 
+    class Config:
+        frozen = True
+
 
 class StylistInfo(BaseModel):
     """スタイリスト情報を表すモデル"""
@@ -58,6 +70,9 @@ class StylistInfo(BaseModel):
     specialties: str = Field(description="得意な技術・特徴")
     description: str = Field(description="説明文")
 
+    class Config:
+        frozen = True
+
 
 class CouponInfo(BaseModel):
     """
@@ -43,7 +43,9 @@ class TemplateManager(TemplateManagerProtocol):
         self.templates: List[Template] = []
         # カテゴリ名をキー、テンプレートのリストを値とする辞書
         self.templates_by_category: Dict[str, List[Template]] = defaultdict(list)
-        
+        # スコアリング用の前計算値（ハッシュタグ集合・小文字化した結合テキスト）
+        self._scoring_index: Dict[int, Tuple[set, str]] = {}
+
         # テンプレートファイルを読み込む
         self._load_templates()
     
@@ -65,6 +67,7 @@ class TemplateManager(TemplateManagerProtocol):
             # テンプレートをクリア
             self.templates.clear()
             self.templates_by_category.clear()
+            self._scoring_index.clear()
             
             # まずCSVをテキストとして読み込み、行ごとに解析
             with open(self.template_file_path, 'r', encoding='utf-8') as f:
@@ -250,43 +253,64 @@ class TemplateManager(TemplateManagerProtocol):
             (スコア, テンプレート) のタプルのリスト（スコア降順）
         """
         scored_templates = []
-        
+
         # 分析結果からキーワードを取得
         analysis_keywords = set(analysis.keywords) if hasattr(analysis, 'keywords') else set()
         analysis_features = analysis.features
-        
+
+        # 分析結果の特徴テキストはテンプレートに依存しないため、ループ外で1回だけ小文字化する
+        # （Pydanticモデルは辞書のようにアクセスできないため、属性として取得）
+        feature_values_lower = [
+            analysis_features.color.lower(),
+            analysis_features.cut_technique.lower(),
+            analysis_features.styling.lower(),
+            analysis_features.impression.lower(),
+        ]
+
         for template in templates:
             score = 0.0
-            
+
             # カテゴリの一致（最も重要）
             if template.category == analysis.category:
                 score += 3.0
-            
+
             # キーワードの一致（2番目に重要）
-            template_tags = set(template.get_hashtags())
+            template_tags, combined_text = self._scoring_attrs(template)
             if template_tags and analysis_keywords:
                 # 共通するキーワードの割合
                 common_keywords = template_tags.intersection(analysis_keywords)
                 keyword_score = len(common_keywords) / max(len(template_tags), 1) * 2.0
                 score += keyword_score
-            
+
             # テキスト内容の類似度（3番目に重要）
             # タイトル、コメント、メニューなどのテキスト内容に分析結果の特徴が含まれているかを評価
-            combined_text = f"{template.title} {template.comment} {template.menu}".lower()
-            
-            # Pydanticモデルは辞書のようにアクセスできないため、属性として取得
-            feature_values = {
-                'color': analysis_features.color,
-                'cut_technique': analysis_features.cut_technique,
-                'styling': analysis_features.styling,
-                'impression': analysis_features.impression
-            }
-            
-            for feature_key, feature_value in feature_values.items():
-                if feature_value.lower() in combined_text:
+            for feature_value in feature_values_lower:
+                if feature_value in combined_text:
                     score += 0.5
-            
+
             scored_templates.append((score, template))
-        
+
         # スコア降順でソート
         return sorted(scored_templates, key=lambda x: x[0], reverse=True)
+
+    def _scoring_attrs(self, template: Template) -> Tuple[set, str]:
+        """
+        テンプレートのスコアリング用前計算値を取得します。
+
+        ハッシュタグの分割・集合化と結合テキストの小文字化はテンプレートごとに
+        不変のため、初回アクセス時に計算して使い回します。
+
+        Args:
+            template: 対象のテンプレート
+
+        Returns:
+            (ハッシュタグ集合, 小文字化した結合テキスト) のタプル
+        """
+        cached = self._scoring_index.get(id(template))
+        if cached is None:
+            cached = (
+                set(template.get_hashtags()),
+                f"{template.title} {template.comment} {template.menu}".lower(),
+            )
+            self._scoring_index[id(template)] = cached
+        return cached
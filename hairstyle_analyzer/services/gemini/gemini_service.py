@@ -6,7 +6,6 @@ Gemini API連携サービスモジュール
 """
 
 import os
-import json
 import time
 import base64
 import logging
@@ -17,6 +16,7 @@ import re
 import random
 
 import google.generativeai as genai
+import orjson
 from pydantic import ValidationError
 
 from ...data.models import StyleAnalysis, StyleFeatures, AttributeAnalysis, StylistInfo, CouponInfo, Template, GeminiConfig
@@ -28,6 +28,20 @@ from ...utils.async_context import AsyncResource, asynccontextmanager, Timer
 # 必要なエラー定義をインポート
 from hairstyle_analyzer.utils.errors import ImageError
 
+# レスポンス解析用の正規表現（呼び出しごとのコンパイル・キャッシュ参照を
+# 避けるため、インポート時に1回だけコンパイルしておく）
+_RE_CODE_BLOCK = re.compile(r'```(?:json)?\s*(.*?)\s*```', re.DOTALL)
+_RE_JSON_OBJECT = re.compile(r'({.*})', re.DOTALL)
+_RE_UNQUOTED_KEY = re.compile(r'([{,])\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:')
+_RE_CATEGORY = re.compile(r'"category"\s*:\s*"([^"]+)"')
+_RE_KEY_VALUE = re.compile(r'"([^"]+)"\s*:\s*"([^"]+)"')
+_RE_KEYWORDS = re.compile(r'"keywords"\s*:\s*\[(.*?)\]', re.DOTALL)
+_RE_QUOTED = re.compile(r'"([^"]+)"')
+_RE_COUPON_NUMBER = re.compile(r'"(?:coupon_number|template_id)"\s*:\s*(\d+)')
+_RE_REASON = re.compile(r'"reason"\s*:\s*"([^"]+)"')
+_RE_STYLIST_NAME = re.compile(r'"stylist_name"\s*:\s*"([^"]+)"')
+
+
 class APISession(AsyncResource):
     """
     Gemini API呼び出し用の非同期コンテキストマネージャー
@@ -101,12 +115,16 @@ class APISession(AsyncResource):
             # 使用するモデルを決定
             model = self.service.fallback_model if self.use_fallback else self.service.model
             
-            # 画像がある場合は追加
+            # 画像がある場合は追加（バッチ分析用に複数画像のリストも受け付ける）
             if self.image_path:
-                # 画像データを準備
-                image_data = self.service._prepare_image(self.image_path)
+                paths = self.image_path if isinstance(self.image_path, list) else [self.image_path]
+                # 画像データを準備（ファイル読み込み・検証・Base64エンコードは
+                # ブロッキング処理のためワーカースレッドで実行する）
+                image_parts = await asyncio.gather(
+                    *[asyncio.to_thread(self.service._prepare_image, path) for path in paths]
+                )
                 # Gemini APIはプロンプトと画像を組み合わせたコンテンツを受け取る
-                content = [self.prompt, image_data]
+                content = [self.prompt, *image_parts]
             else:
                 # 画像なしの場合はテキストのみ
                 content = [self.prompt]
@@ -148,24 +166,26 @@ class GeminiService:
     画像からヘアスタイルの特徴、カテゴリ、性別、髪の長さなどを抽出します。
     """
     
-    def __init__(self, config: GeminiConfig):
+    def __init__(self, config: GeminiConfig, api_key: Optional[str] = None):
         """
         初期化
-        
+
         Args:
             config: Gemini API設定
+            api_key: APIキー（指定した場合はconfigの値より優先されます）
         """
         self.logger = logging.getLogger(__name__)
         self.config = config
-        
+        self._api_key = api_key or config.api_key
+
         # APIキーのバリデーション
-        if not self.config.api_key:
+        if not self._api_key:
             self.logger.error("Gemini APIキーが設定されていません")
             self.logger.error("プロジェクトルートに.envファイルを作成し、GEMINI_API_KEY=your_api_key_here を設定してください")
             raise GeminiAPIError("APIキーが設定されていません", error_type="AUTHENTICATION_ERROR")
-        
+
         # Gemini APIを設定
-        genai.configure(api_key=self.config.api_key)
+        genai.configure(api_key=self._api_key)
         
         # モデルの初期化
         self._init_models()
@@ -358,10 +378,10 @@ class GeminiService:
             Exception: JSONの抽出やパースに失敗した場合
         """
         # マークダウンのコードブロックを取り除く
-        clean_text = re.sub(r'```(?:json)?\s*(.*?)\s*```', r'\1', response_text, flags=re.DOTALL)
+        clean_text = _RE_CODE_BLOCK.sub(r'\1', response_text)
         
         # JSONの開始と終了の波括弧を探す
-        json_match = re.search(r'({.*})', clean_text, re.DOTALL)
+        json_match = _RE_JSON_OBJECT.search(clean_text)
         if json_match:
             json_str = json_match.group(1)
             
@@ -369,10 +389,11 @@ class GeminiService:
             json_str = json_str.strip().replace('\n', ' ').replace('\\', '\\\\')
             
             # 引用符がない場合はJSONプロパティ名に引用符を追加
-            json_str = re.sub(r'([{,])\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*:', r'\1 "\2":', json_str)
+            json_str = _RE_UNQUOTED_KEY.sub(r'\1 "\2":', json_str)
             
-            # JSONパース
-            return json.loads(json_str)
+            # JSONパース（orjsonはUTF-8パスをゼロコピーで処理するため、
+            # 画像1枚あたり数KBの構造化レスポンスでもstdlib jsonより高速）
+            return orjson.loads(json_str)
         
         raise ValueError("レスポンスからJSONパターンが見つかりませんでした")
     
@@ -407,7 +428,7 @@ class GeminiService:
     def _extract_category_data(self, text: str) -> Dict[str, Any]:
         """カテゴリ情報を抽出"""
         data = {}
-        category_match = re.search(r'"category"\s*:\s*"([^"]+)"', text)
+        category_match = _RE_CATEGORY.search(text)
         if category_match:
             data["category"] = category_match.group(1)
         return data
@@ -416,7 +437,7 @@ class GeminiService:
         """特徴情報を抽出"""
         data = {}
         features = {}
-        feature_matches = re.finditer(r'"([^"]+)"\s*:\s*"([^"]+)"', text)
+        feature_matches = _RE_KEY_VALUE.finditer(text)
         for match in feature_matches:
             key, value = match.groups()
             if key in ["color", "cut_technique", "styling", "impression"]:
@@ -429,10 +450,10 @@ class GeminiService:
     def _extract_keywords_data(self, text: str) -> Dict[str, Any]:
         """キーワード情報を抽出"""
         data = {}
-        keywords_match = re.search(r'"keywords"\s*:\s*\[(.*?)\]', text, re.DOTALL)
+        keywords_match = _RE_KEYWORDS.search(text)
         if keywords_match:
             keywords_str = keywords_match.group(1)
-            keywords = [k.strip(' "\'') for k in re.findall(r'"([^"]+)"', keywords_str)]
+            keywords = [k.strip(' "\'') for k in _RE_QUOTED.findall(keywords_str)]
             data["keywords"] = keywords
         else:
             data["keywords"] = []
@@ -441,14 +462,14 @@ class GeminiService:
     def _extract_coupon_template_data(self, text: str) -> Dict[str, Any]:
         """クーポン・テンプレート選択用のデータ抽出"""
         data = {}
-        number_match = re.search(r'"(?:coupon_number|template_id)"\s*:\s*(\d+)', text)
+        number_match = _RE_COUPON_NUMBER.search(text)
         if number_match:
             if "coupon_number" in text:
                 data["coupon_number"] = int(number_match.group(1))
             else:
                 data["template_id"] = int(number_match.group(1))
         
-        reason_match = re.search(r'"reason"\s*:\s*"([^"]+)"', text)
+        reason_match = _RE_REASON.search(text)
         if reason_match:
             data["reason"] = reason_match.group(1)
         return data
@@ -456,7 +477,7 @@ class GeminiService:
     def _extract_stylist_data(self, text: str) -> Dict[str, Any]:
         """スタイリスト選択用のデータ抽出"""
         data = {}
-        stylist_match = re.search(r'"stylist_name"\s*:\s*"([^"]+)"', text)
+        stylist_match = _RE_STYLIST_NAME.search(text)
         if stylist_match:
             data["stylist_name"] = stylist_match.group(1)
         return data
@@ -513,13 +534,31 @@ class GeminiService:
         
         # JSONとしてパース
         json_data = self._parse_json_response(response_text)
-        
+
+        analysis = self._build_style_analysis(json_data, categories)
+        if analysis:
+            self.logger.info(f"画像分析完了: カテゴリ={analysis.category}, キーワード数={len(analysis.keywords)}")
+        return analysis
+
+    def _build_style_analysis(self, json_data: Dict[str, Any], categories: List[str]) -> Optional[StyleAnalysis]:
+        """
+        APIレスポンスのJSONデータからStyleAnalysisを作成します。
+
+        欠損フィールドはデフォルト値で補完します。
+
+        Args:
+            json_data: パース済みのJSONデータ
+            categories: カテゴリリスト
+
+        Returns:
+            分析結果、または作成に失敗した場合はNone
+        """
         try:
             # キーワードがない場合は空のリストを設定
             if "keywords" not in json_data or not json_data["keywords"]:
                 self.logger.warning("キーワードが見つかりません。空のリストを使用します。")
                 json_data["keywords"] = []
-            
+
             # 特徴が辞書でない場合は修正
             if "features" not in json_data or not isinstance(json_data["features"], dict):
                 self.logger.warning("特徴が見つからないか無効です。デフォルト値を使用します。")
@@ -529,12 +568,12 @@ class GeminiService:
                     "styling": "不明",
                     "impression": "不明"
                 }
-            
+
             # 必須のフィールドがない場合はデフォルト値を設定
             for field in ["color", "cut_technique", "styling", "impression"]:
                 if field not in json_data["features"]:
                     json_data["features"][field] = "不明"
-            
+
             # 特徴データを作成
             features = StyleFeatures(
                 color=json_data["features"]["color"],
@@ -542,26 +581,128 @@ class GeminiService:
                 styling=json_data["features"]["styling"],
                 impression=json_data["features"]["impression"]
             )
-            
+
             # カテゴリが含まれていない場合はデフォルト値を設定
             if "category" not in json_data or not json_data["category"]:
                 self.logger.warning("カテゴリが見つかりません。最初のカテゴリを使用します。")
                 json_data["category"] = categories[0] if categories else "不明"
-            
+
             # 分析結果を作成
-            analysis = StyleAnalysis(
+            return StyleAnalysis(
                 category=json_data["category"],
                 features=features,
                 keywords=json_data["keywords"]
             )
-            
-            self.logger.info(f"画像分析完了: カテゴリ={analysis.category}, キーワード数={len(analysis.keywords)}")
-            return analysis
-            
+
         except Exception as e:
             self.logger.error(f"分析結果の作成に失敗しました: {str(e)}")
             return None
-    
+
+    @async_with_error_handling(GeminiAPIError, "画像バッチ分析に失敗しました")
+    async def analyze_images_batch(self, image_paths: List[Path], categories: List[str]) -> List[Optional[StyleAnalysisProtocol]]:
+        """
+        複数の画像を1回のAPI呼び出しでまとめて分析します。
+
+        1リクエストに複数の画像を添付することで、画像ごとの接続・認証・
+        フレーミングのオーバーヘッドを削減します。応答の解析に失敗した
+        画像はNoneとして返すため、呼び出し側で1枚ずつの分析に
+        フォールバックできます。
+
+        Args:
+            image_paths: 画像ファイルのパスリスト
+            categories: カテゴリリスト
+
+        Returns:
+            入力と同じ順序の分析結果リスト（失敗した画像はNone）
+
+        Raises:
+            GeminiAPIError: API呼び出しに失敗した場合
+        """
+        if not image_paths:
+            return []
+
+        count = len(image_paths)
+        categories_str = "\n".join([f"- {category}" for category in categories])
+
+        batch_prompt = f"""
+添付された{count}枚のヘアスタイル画像を、添付順にそれぞれ詳細に分析してください。
+
+各画像について:
+1. カテゴリ (以下から1つだけ選択してください):
+{categories_str}
+
+2. 特徴:
+   - 髪色: 色調や特徴を詳しく
+   - カット技法: レイヤー、グラデーション、ボブなど
+   - スタイリング: ストレート、ウェーブ、パーマなど
+   - 印象: フェミニン、クール、ナチュラルなど
+
+3. キーワード: ヘアスタイルを表す簡潔な単語や句を5つ
+
+必ず要素数{count}のJSON配列のみを出力してください。配列のn番目の要素がn枚目の画像に対応します：
+[
+  {{
+    "category": "カテゴリ名",
+    "features": {{
+      "color": "詳細な色の説明",
+      "cut_technique": "カット技法の説明",
+      "styling": "スタイリング方法の説明",
+      "impression": "全体的な印象"
+    }},
+    "keywords": ["キーワード1", "キーワード2", "キーワード3", "キーワード4", "キーワード5"]
+  }}
+]
+"""
+
+        # API呼び出し（複数画像を1リクエストに添付）
+        response_text = await self._call_gemini_api(batch_prompt, list(image_paths))
+
+        # JSON配列としてパース
+        entries = self._parse_json_array_response(response_text, count)
+
+        analyses = [
+            self._build_style_analysis(entry, categories) if isinstance(entry, dict) else None
+            for entry in entries
+        ]
+
+        succeeded = sum(1 for analysis in analyses if analysis is not None)
+        self.logger.info(f"バッチ画像分析完了: {succeeded}/{count}枚成功")
+        return analyses
+
+    def _parse_json_array_response(self, response_text: str, expected_count: int) -> List[Any]:
+        """
+        APIレスポンスからJSON配列を抽出・パースします。
+
+        Args:
+            response_text: APIレスポンステキスト
+            expected_count: 期待する要素数
+
+        Returns:
+            長さexpected_countのリスト（パースできなかった要素はNone）
+        """
+        try:
+            start = response_text.find('[')
+            end = response_text.rfind(']')
+            if start == -1 or end == -1 or end <= start:
+                self.logger.warning("レスポンスにJSON配列が見つかりません")
+                return [None] * expected_count
+
+            entries = orjson.loads(response_text[start:end + 1])
+            if not isinstance(entries, list):
+                self.logger.warning("JSON配列のパース結果がリストではありません")
+                return [None] * expected_count
+
+            # 要素数が合わない場合は切り詰め・None埋めで期待数に揃える
+            if len(entries) != expected_count:
+                self.logger.warning(f"JSON配列の要素数が一致しません: {len(entries)} != {expected_count}")
+                entries = entries[:expected_count] + [None] * max(0, expected_count - len(entries))
+
+            return entries
+
+        except orjson.JSONDecodeError as e:
+            self.logger.warning(f"JSON配列のパースに失敗しました: {str(e)}")
+            return [None] * expected_count
+
     @async_with_error_handling(GeminiAPIError, "属性分析に失敗しました")
     async def analyze_attributes(self, image_path: Path) -> Optional[AttributeAnalysisProtocol]:
         """
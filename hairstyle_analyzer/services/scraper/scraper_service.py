@@ -277,21 +277,24 @@ class ScraperService:
         except Exception as e:
             raise NetworkError(f"ページ取得中に予期しないエラーが発生しました: {str(e)}", {"url": url})
 
-    def _parse_html(self, html_content: str) -> BeautifulSoup:
+    async def _parse_html(self, html_content: str) -> BeautifulSoup:
         """
         HTML文字列をBeautifulSoupオブジェクトに変換します。
-        
+
+        HTML解析はCPU負荷の高い同期処理のため、別スレッドで実行して
+        イベントループ（Streamlit UIの進捗更新など）をブロックしないようにします。
+
         Args:
             html_content: HTML文字列
-            
+
         Returns:
             BeautifulSoupオブジェクト
-            
+
         Raises:
             ParseError: HTML解析中にエラーが発生した場合
         """
         try:
-            return BeautifulSoup(html_content, 'html.parser')
+            return await asyncio.to_thread(BeautifulSoup, html_content, 'html.parser')
         except Exception as e:
             raise ParseError(f"HTML解析エラー: {str(e)}")
 
@@ -318,7 +321,7 @@ class ScraperService:
         # ページの取得（レート制限・キャッシュ機能付き）
         stylist_page_url = salon_url + "stylist/"
         page_content = await self._rate_limited_request(stylist_page_url)
-        soup = self._parse_html(page_content)
+        soup = await self._parse_html(page_content)
         
         # スタイリスト情報の取得
         stylist_info_list = []
@@ -417,7 +420,7 @@ class ScraperService:
         
         # 最初のページを処理
         page_content = await self._rate_limited_request(coupon_page_url)
-        soup = self._parse_html(page_content)
+        soup = await self._parse_html(page_content)
         
         # 現在のページからクーポンを取得
         coupons = self._extract_coupons_from_page(soup)
@@ -461,7 +464,7 @@ class ScraperService:
             try:
                 self.logger.info(f"ページ {current_page}/{max_page} を処理中: {page_url}")
                 page_content = await self._rate_limited_request(page_url)
-                soup = self._parse_html(page_content)
+                soup = await self._parse_html(page_content)
                 
                 # 現在のページからクーポンを取得
                 coupons = self._extract_coupons_from_page(soup)
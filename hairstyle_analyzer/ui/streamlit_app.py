@@ -7,14 +7,20 @@ Streamlitアプリケーションモジュール
 
 import os
 import sys
+import shutil
+import hashlib
 import logging
 import asyncio
+import threading
 import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 import streamlit as st
+from streamlit import runtime as st_runtime
 import pandas as pd
 from PIL import Image
 import io
@@ -31,10 +37,21 @@ SESSION_STYLISTS = "stylists"
 SESSION_COUPONS = "coupons"
 SESSION_PROGRESS = "progress"
 SESSION_USE_CACHE = "use_cache"
-SESSION_CONFIG = "config"
+SESSION_EVENT_LOOP = "event_loop"
 SESSION_PROCESSING_STAGES = "processing_stages"  # 処理段階を追跡するための新しいセッションキー
 SESSION_TEMPLATE_CHOICES = "template_choices"  # テンプレート選択肢を保存するセッションキー
 SESSION_USER_SELECTIONS = "user_selections"  # ユーザーの選択を保存するセッションキー
+SESSION_TEMPLATE_TITLES = "template_titles"  # ラジオボタン用に整形済みのタイトルを保存するセッションキー
+
+# 画像1枚あたりの処理段階（進捗表示用）
+PROCESSING_STAGES = (
+    "画像読み込み",
+    "スタイル分析",
+    "テンプレートマッチング",
+    "スタイリスト選択",
+    "タイトル生成",
+)
+_STAGES_JOINED = ", ".join(PROCESSING_STAGES)
 
 # モジュールのインポート
 from hairstyle_analyzer.data.config_manager import ConfigManager
@@ -96,6 +113,10 @@ def has_session_key(key):
 
 def init_session_state():
     """セッションステートを初期化"""
+    # 初期化済みなら個別キーのチェックをすべてスキップ（番兵キーで1回判定）
+    if st.session_state.get("_session_initialized"):
+        return
+
     # セッション変数の初期化
     if not has_session_key(SESSION_PROCESSOR):
         set_session_value(SESSION_PROCESSOR, None)
@@ -124,29 +145,56 @@ def init_session_state():
     # APIキーのセッション変数初期化は削除
     if not has_session_key(SESSION_SALON_URL):
         set_session_value(SESSION_SALON_URL, "")
+    # 処理ステージの辞書はここで1回だけ確保し、以降はフラグのみ書き換える
+    if not has_session_key(SESSION_PROCESSING_STAGES):
+        set_session_value(SESSION_PROCESSING_STAGES, {
+            'processing_done': False,
+            'template_selection_done': False,
+            'results_display_done': False
+        })
+
+    st.session_state["_session_initialized"] = True
 
 
 def update_progress(current, total, message="", stage_details=None):
     """進捗状況の更新"""
-    if has_session_key(SESSION_PROGRESS):
-        progress = get_session_value(SESSION_PROGRESS)
-        progress["current"] = current
-        progress["total"] = total
-        progress["message"] = message
-        
-        # 処理段階の詳細情報を追加
-        if stage_details:
-            progress["stage_details"] = stage_details
-        
-        # 完了時の処理
-        if current >= total and total > 0:
-            progress["complete"] = True
-        
-        set_session_value(SESSION_PROGRESS, progress)
+    # セッション内の辞書は参照で取得できるため、直接まとめて更新すればよい
+    progress = st.session_state.get(SESSION_PROGRESS)
+    if progress is None:
+        return
+
+    progress.update(current=current, total=total, message=message)
+
+    # 処理段階の詳細情報を追加
+    if stage_details:
+        progress["stage_details"] = stage_details
+
+    # 完了時の処理
+    if current >= total and total > 0:
+        progress["complete"] = True
+
+
+def _run_async(coro):
+    """セッションで使い回すイベントループ上でコルーチンを実行する
 
+    asyncio.runはバッチごとに新しいループを生成・破棄するため、プロセッサーが
+    温めたコネクションプールなどが毎回失われます。ループをセッションステートに
+    保持し、同一セッション内の複数バッチで使い回します。
+    """
+    loop = get_session_value(SESSION_EVENT_LOOP)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        set_session_value(SESSION_EVENT_LOOP, loop)
+    asyncio.set_event_loop(loop)
+    return loop.run_until_complete(coro)
 
-async def process_images(processor, image_paths, stylists=None, coupons=None, use_cache=False):
-    """画像を処理して結果を取得する非同期関数"""
+
+async def process_images(processor, image_paths, stylists=None, coupons=None, use_cache=False, on_result=None):
+    """画像を処理して結果を取得する非同期関数
+
+    on_resultを指定すると、1枚完了するごとにその結果を引数に呼び出します。
+    全件完了を待たずに途中結果をUIに反映する用途に使います。
+    """
     results = []
     total = len(image_paths)
     
@@ -170,15 +218,9 @@ async def process_images(processor, image_paths, stylists=None, coupons=None, us
     if not image_paths:
         logging.error("画像パスが空です")
         return []
-    
-    # 処理段階の定義
-    processing_stages = [
-        "画像読み込み",
-        "スタイル分析",
-        "テンプレートマッチング",
-        "スタイリスト選択",
-        "タイトル生成"
-    ]
+
+    # 文字列パスを入口で一括してPathオブジェクトに変換しておく
+    image_paths = [Path(p) if isinstance(p, str) else p for p in image_paths]
     
     # 進捗状況の初期化
     progress = {
@@ -187,83 +229,85 @@ async def process_images(processor, image_paths, stylists=None, coupons=None, us
         "message": "初期化中...",
         "start_time": time.time(),
         "complete": False,
-        "stage_details": f"準備中: {processing_stages[0]}"
+        "stage_details": f"準備中: {PROCESSING_STAGES[0]}"
     }
     st.session_state[SESSION_PROGRESS] = progress
     
     try:
         # キャッシュ設定を適用
         processor.use_cache = use_cache
-        
-        # 各画像を処理
-        for i, image_path in enumerate(image_paths):
-            try:
-                # 進捗状況の更新
-                progress["current"] = i
-                progress["message"] = f"画像 {i+1}/{total} を処理中..."
-                
-                # 文字列パスをPathオブジェクトに変換
-                path_obj = Path(image_path) if isinstance(image_path, str) else image_path
-                
-                # ログに記録
-                image_name = path_obj.name
-                logging.info(f"画像 {image_name} の処理を開始します")
-                
-                # 処理段階の詳細情報を更新
-                stage_details = f"画像: {image_name}\n"
-                stage_details += f"現在の段階: {processing_stages[0]}\n"
-                stage_details += f"次の段階: {processing_stages[1]}"
-                progress["stage_details"] = stage_details
-                
-                # セッションステートを更新して進捗表示を更新
-                st.session_state[SESSION_PROGRESS] = progress
-                
-                # 明示的な遅延を入れて、UIの更新を確実にする
-                await asyncio.sleep(0.1)
-                
-                # 画像処理
-                if stylists and coupons:
-                    # スタイリストとクーポンのデータを渡して処理
-                    result = await processor.process_single_image(path_obj, stylists, coupons, use_cache=use_cache)
-                else:
-                    # 基本処理
-                    result = await processor.process_single_image(path_obj, use_cache=use_cache)
-                
-                # 処理段階の詳細情報を更新（完了）
-                stage_details = f"画像: {image_name}\n"
-                stage_details += f"完了した段階: {', '.join(processing_stages)}\n"
-                stage_details += "処理完了"
-                progress["stage_details"] = stage_details
-                st.session_state[SESSION_PROGRESS] = progress
-                
-                # 明示的な遅延を入れて、UIの更新を確実にする
-                await asyncio.sleep(0.1)
-                
-                # 結果にファイル名を追加
-                if result:
-                    if isinstance(result, dict) and 'image_name' not in result:
+
+        # 結果リストをセッションに公開し、処理中の再実行でも途中結果を表示できるようにする
+        st.session_state[SESSION_RESULTS] = results
+
+        # 同時実行数をバッチサイズで制限するセマフォ
+        # （Gemini API呼び出しはI/Oバウンドのため、並行実行で全体の処理時間を短縮する）
+        semaphore = asyncio.Semaphore(max(1, processor.batch_size or 4))
+
+        async def process_one(path_obj):
+            """セマフォで同時実行数を制限しながら1枚の画像を処理する"""
+            image_name = path_obj.name
+
+            async with semaphore:
+                try:
+                    logging.info(f"画像 {image_name} の処理を開始します")
+
+                    # 画像処理
+                    if stylists and coupons:
+                        # スタイリストとクーポンのデータを渡して処理
+                        result = await processor.process_single_image(path_obj, stylists, coupons, use_cache=use_cache)
+                    else:
+                        # 基本処理
+                        result = await processor.process_single_image(path_obj, use_cache=use_cache)
+
+                    # 結果にファイル名を追加
+                    if result and isinstance(result, dict) and 'image_name' not in result:
                         result['image_name'] = image_name
                         result['image_path'] = str(path_obj)
-                    results.append(result)
-                
+
+                    # 処理段階の詳細情報を更新（完了）
+                    stage_details = f"画像: {image_name}\n"
+                    stage_details += f"完了した段階: {_STAGES_JOINED}\n"
+                    stage_details += "処理完了"
+                    progress["stage_details"] = stage_details
+
+                    return result
+
+                except Exception as e:
+                    # 個別の画像処理中のエラーをログに記録（他の画像の処理は続行）
+                    logging.error(f"画像処理エラー ({image_name}): {str(e)}")
+                    logging.error(traceback.format_exc())
+
+                    # エラー情報を進捗詳細に追加
+                    stage_details = f"画像: {image_name}\n"
+                    stage_details += f"エラー発生: {str(e)}\n"
+                    stage_details += "他の画像の処理を続行します"
+                    progress["stage_details"] = stage_details
+
+                    return None
+
+        # 全画像をタスクとして起動し、完了した順に進捗を更新しながら結果を回収する
+        tasks = [asyncio.create_task(process_one(image_path)) for image_path in image_paths]
+        for completed in asyncio.as_completed(tasks):
+            try:
+                result = await completed
             except Exception as e:
-                # 個別の画像処理中のエラーをログに記録（処理は続行）
-                logging.error(f"画像処理エラー ({image_name}): {str(e)}")
-                import traceback
-                logging.error(traceback.format_exc())
-                
-                # エラー情報を進捗詳細に追加
-                stage_details = f"画像: {image_name}\n"
-                stage_details += f"エラー発生: {str(e)}\n"
-                stage_details += "次の画像に進みます"
-                progress["stage_details"] = stage_details
-                st.session_state[SESSION_PROGRESS] = progress
-                
-                # 明示的な遅延を入れて、UIの更新を確実にする
-                await asyncio.sleep(0.1)
-                
-                continue
-        
+                logging.error(f"画像処理タスクでエラーが発生: {str(e)}")
+                result = None
+
+            # 1枚完了するごとに進捗状況を更新
+            progress["current"] += 1
+            progress["message"] = f"画像 {progress['current']}/{total} を処理しました"
+            st.session_state[SESSION_PROGRESS] = progress
+
+            if result is not None:
+                results.append(result)
+                if on_result is not None:
+                    try:
+                        on_result(result)
+                    except Exception as e:
+                        logging.warning(f"途中結果の表示に失敗しました: {e}")
+
         # 進捗状況の更新
         progress["current"] = total
         progress["message"] = "処理完了"
@@ -276,7 +320,6 @@ async def process_images(processor, image_paths, stylists=None, coupons=None, us
     except Exception as e:
         # 全体の処理中のエラーをログに記録
         logging.error(f"画像処理全体でエラーが発生: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         
         # エラー情報を進捗詳細に追加
@@ -285,84 +328,108 @@ async def process_images(processor, image_paths, stylists=None, coupons=None, us
             progress["message"] = f"エラーが発生しました: {str(e)}"
             progress["stage_details"] = f"処理中にエラーが発生しました:\n{str(e)}"
             set_session_value(SESSION_PROGRESS, progress)
-        
-        # UIの更新を確実にするための遅延
-        await asyncio.sleep(0.1)
-        
+
         return []
 
 
+@st.cache_resource(show_spinner=False)
+def _get_template_manager(csv_path, mtime):
+    """テンプレートCSVを解析済みのTemplateManagerを取得する
+
+    ファイルのmtimeをキャッシュキーに含めるため、CSVが実際に更新された
+    場合のみ再解析が走ります。
+    """
+    return TemplateManager(csv_path)
+
+
+@st.cache_resource(show_spinner=False, hash_funcs={ConfigManager: lambda cm: cm.config_hash})
+def _build_processor(config_manager, api_key, use_cache):
+    """プロセッサーと依存サービス一式を構築する
+
+    TemplateManagerのCSV読み込みやCacheManagerのJSON読み込みなど初期化コストが
+    大きいため、st.cache_resourceで同じ設定・APIキーに対して一度だけ構築します。
+    """
+    # テンプレートマネージャーの初期化（CSVのmtimeをキーに解析結果を共有）
+    template_csv = Path(config_manager.paths.template_csv)
+    template_mtime = template_csv.stat().st_mtime if template_csv.exists() else 0.0
+    template_manager = _get_template_manager(template_csv, template_mtime)
+    logging.info(f"テンプレートファイル: {config_manager.paths.template_csv}")
+
+    # テンプレートマネージャーの初期化確認
+    if not template_manager:
+        logging.error("テンプレートマネージャーの初期化に失敗しました")
+        return None
+
+    # キャッシュマネージャーの初期化
+    cache_manager = CacheManager(config_manager.paths.cache_file, config_manager.cache)
+    logging.info(f"キャッシュファイル: {config_manager.paths.cache_file}")
+
+    # GeminiServiceの初期化（コンフィグは変更せず、APIキーを直接コンストラクタに渡す）
+    gemini_service = GeminiService(config_manager.gemini, api_key=api_key)
+    logging.info(f"Gemini API設定: モデル={config_manager.gemini.model}")
+
+    # 各コアコンポーネントの初期化
+    image_analyzer = ImageAnalyzer(gemini_service, cache_manager)
+    template_matcher = TemplateMatcher(template_manager)
+    style_matcher = StyleMatchingService(gemini_service)
+    excel_exporter = ExcelExporter(config_manager.excel)
+    text_exporter = TextExporter(config_manager.text)
+
+    # メインプロセッサーの初期化
+    return MainProcessor(
+        image_analyzer=image_analyzer,
+        template_matcher=template_matcher,
+        style_matcher=style_matcher,
+        excel_exporter=excel_exporter,
+        text_exporter=text_exporter,
+        cache_manager=cache_manager,
+        batch_size=config_manager.processing.batch_size,
+        api_delay=config_manager.processing.api_delay,
+        use_cache=use_cache
+    )
+
+
 def create_processor(config_manager):
     """プロセッサーを作成する関数"""
     try:
         logging.info("プロセッサーの作成を開始します")
-        
+
         # 設定マネージャーがNoneの場合の対応
         if config_manager is None:
             logging.error("設定マネージャーがNoneです")
             return None
-        
-        # テンプレートマネージャーの初期化
-        template_manager = TemplateManager(config_manager.paths.template_csv)
-        logging.info(f"テンプレートファイル: {config_manager.paths.template_csv}")
-        
-        # テンプレートマネージャーの初期化確認
-        if not template_manager:
-            logging.error("テンプレートマネージャーの初期化に失敗しました")
-            return None
-        
-        # キャッシュマネージャーの初期化
-        cache_manager = CacheManager(config_manager.paths.cache_file, config_manager.cache)
-        logging.info(f"キャッシュファイル: {config_manager.paths.cache_file}")
-        
+
         # APIキーの確認と取得
         api_key = get_api_key()
         if not api_key:
             logging.warning("APIキーが設定されていません。画像処理は機能しません。")
-        
-        # GeminiServiceの初期化（APIキーを直接コンストラクタに渡す）
-        # コンフィグにAPIキーを設定
-        config_manager.gemini.api_key = api_key
-        
-        # APIキーを含むコンフィグでGeminiServiceを初期化
-        gemini_service = GeminiService(config_manager.gemini)
-        logging.info(f"Gemini API設定: モデル={config_manager.gemini.model}")
-        
-        # 各コアコンポーネントの初期化
-        image_analyzer = ImageAnalyzer(gemini_service, cache_manager)
-        template_matcher = TemplateMatcher(template_manager)
-        style_matcher = StyleMatchingService(gemini_service)
-        excel_exporter = ExcelExporter(config_manager.excel)
-        text_exporter = TextExporter(config_manager.text)
-        
+
         # キャッシュ使用設定の取得
         use_cache = st.session_state.get(SESSION_USE_CACHE, True)
         logging.info(f"キャッシュ使用設定: {use_cache}")
-        
-        # メインプロセッサーの初期化
-        processor = MainProcessor(
-            image_analyzer=image_analyzer,
-            template_matcher=template_matcher,
-            style_matcher=style_matcher,
-            excel_exporter=excel_exporter,
-            text_exporter=text_exporter,
-            cache_manager=cache_manager,
-            batch_size=config_manager.processing.batch_size,
-            api_delay=config_manager.processing.api_delay,
-            use_cache=use_cache
-        )
-        
+
+        # キャッシュされた構築関数からプロセッサーを取得
+        processor = _build_processor(config_manager, api_key, use_cache)
+
         logging.info("プロセッサーの作成が完了しました")
         return processor
-        
+
     except Exception as e:
         # エラーの詳細をログに記録
         logging.error(f"プロセッサー作成中にエラーが発生: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         return None
 
 
+def _format_duration(seconds):
+    """秒数を表示用の文字列（秒または分秒）に整形する"""
+    if seconds < 60:
+        return f"{seconds:.1f}秒"
+    minutes = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{minutes}分{secs}秒"
+
+
 def display_progress():
     """進捗状況の表示"""
     if has_session_key(SESSION_PROGRESS):
@@ -426,39 +493,31 @@ def display_progress():
             with col2:
                 # 処理時間の表示
                 if progress["start_time"]:
-                    elapsed = time.time() - progress["start_time"]
-                    
-                    # 経過時間のフォーマット
-                    if elapsed < 60:
-                        elapsed_str = f"{elapsed:.1f}秒"
-                    else:
-                        minutes = int(elapsed // 60)
-                        seconds = int(elapsed % 60)
-                        elapsed_str = f"{minutes}分{seconds}秒"
-                    
-                    st.write(f"**経過時間**: {elapsed_str}")
-                    
-                    # 処理速度の計算と表示
-                    if current > 0:
-                        speed = current / elapsed
-                        if speed < 1:
-                            st.write(f"**処理速度**: {speed:.2f} 画像/秒")
-                        else:
-                            st.write(f"**処理速度**: {speed*60:.1f} 画像/分")
-                    
-                    # 残り時間の予測（現在の進捗から）
-                    if 0 < current < total:
-                        remaining = (elapsed / current) * (total - current)
-                        
-                        # 残り時間のフォーマット
-                        if remaining < 60:
-                            remaining_str = f"{remaining:.1f}秒"
-                        else:
-                            minutes = int(remaining // 60)
-                            seconds = int(remaining % 60)
-                            remaining_str = f"{minutes}分{seconds}秒"
-                        
-                        st.write(f"**推定残り時間**: {remaining_str}")
+                    # 進捗が進んでいない再実行では前回整形した統計を再利用する
+                    stats = progress.get("_render_stats")
+                    if stats is None or progress.get("_last_render_current") != current:
+                        # 時刻は1回だけ取得し、経過時間・速度・残り時間をまとめて計算
+                        elapsed = time.time() - progress["start_time"]
+                        stats = [f"**経過時間**: {_format_duration(elapsed)}"]
+
+                        # 処理速度の計算
+                        if current > 0 and elapsed > 0:
+                            speed = current / elapsed
+                            if speed < 1:
+                                stats.append(f"**処理速度**: {speed:.2f} 画像/秒")
+                            else:
+                                stats.append(f"**処理速度**: {speed*60:.1f} 画像/分")
+
+                            # 残り時間の予測（現在の進捗から）
+                            if current < total:
+                                remaining = (elapsed / current) * (total - current)
+                                stats.append(f"**推定残り時間**: {_format_duration(remaining)}")
+
+                        progress["_render_stats"] = stats
+                        progress["_last_render_current"] = current
+
+                    for line in stats:
+                        st.write(line)
             
             # 処理段階の表示（折りたたみ可能）
             if "stage_details" in progress:
@@ -471,6 +530,105 @@ def display_progress():
                 st.success(f"🎉 処理が完了しました: {current}/{total}画像")
 
 
+@st.cache_data(show_spinner=False)
+def _encode_image_thumbnail(path: str, mtime: float) -> bytes:
+    """画像ファイルをサムネイルJPEGのバイト列にエンコードする
+
+    パスと更新時刻をキーにキャッシュするため、同じ画像を表示する再実行では
+    デコードもエンコードも発生しません。
+    """
+    with Image.open(path) as img:
+        img.thumbnail((800, 800), Image.LANCZOS)
+        if img.mode in ('RGBA', 'P'):
+            img = img.convert('RGB')
+        buf = io.BytesIO()
+        img.save(buf, format='JPEG', quality=85)
+        return buf.getvalue()
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _preview_thumbnail(file_bytes: bytes, name: str, width: int = 200) -> bytes:
+    """アップロードプレビュー用のサムネイルJPEGを生成する
+
+    ファイル内容をキーにキャッシュするため、同じアップロードに対する再実行では
+    PILによる再デコードが発生しません。
+    """
+    img = Image.open(io.BytesIO(file_bytes))
+    # JPEGではIDCT段階の縮小デコードが効くため、フル解像度のピクセルバッファを
+    # 展開せずに済む
+    img.draft('RGB', (width * 2, width * 2))
+    img.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+    if img.mode in ('RGBA', 'P'):
+        img = img.convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, format='JPEG', quality=80)
+    return buf.getvalue()
+
+
+def _render_template_choice(i, result):
+    """1画像分のテンプレート選択UIを描画する
+
+    st.formの内側で呼ばれるため、ラジオボタンを操作しても再実行は発生せず、
+    フォームの送信時にまとめて選択内容が反映されます。
+    """
+    image_name = result.image_name
+    template_choices = st.session_state.setdefault(SESSION_TEMPLATE_CHOICES, {})
+    user_selections = st.session_state.setdefault(SESSION_USER_SELECTIONS, {})
+    template_titles_map = st.session_state.setdefault(SESSION_TEMPLATE_TITLES, {})
+    templates = template_choices[image_name]
+
+    # 画像ごとにエクスパンダーを表示
+    with st.expander(f"画像 {i+1}: {image_name}", expanded=(i==0)):
+        cols = st.columns([1, 2])
+
+        with cols[0]:
+            # 画像を表示（可能な場合）
+            if hasattr(result, 'image_data') and result.image_data:
+                try:
+                    st.image(result.image_data, caption=f"画像: {image_name}", use_column_width=True)
+                except Exception as e:
+                    st.error(f"画像の表示中にエラーが発生しました: {str(e)}")
+            elif hasattr(result, 'image_path') and result.image_path:
+                try:
+                    # エンコード済みサムネイルをキャッシュから取得して表示
+                    image_path = str(result.image_path)
+                    thumb_bytes = _encode_image_thumbnail(image_path, os.path.getmtime(image_path))
+                    st.image(thumb_bytes, caption=f"画像: {image_name}", use_column_width=True)
+                except Exception as e:
+                    st.error(f"画像ファイルの表示中にエラーが発生しました: {str(e)}")
+            else:
+                st.info("画像データが利用できません")
+
+        with cols[1]:
+            # 整形済みのタイトルをセッションから取得
+            template_titles = template_titles_map[image_name]
+
+            # ユーザー選択のデフォルト値を設定
+            default_idx = user_selections.get(image_name, 0)
+
+            # テンプレート選択用のラジオボタン
+            selected_idx = st.radio(
+                "テンプレートを選択してください",
+                options=range(len(template_titles)),
+                format_func=lambda i: template_titles[i],
+                index=default_idx,
+                key=f"template_radio_{image_name}"
+            )
+
+            # 選択をセッションに保存
+            user_selections[image_name] = selected_idx
+
+            # 選択されたテンプレート情報を表示
+            selected_template = templates[selected_idx]
+            st.markdown("### 選択されたテンプレート情報")
+            st.markdown(f"**カテゴリ:** {selected_template.category}")
+            st.markdown(f"**タイトル:** {selected_template.title}")
+            st.markdown(f"**メニュー:** {selected_template.menu}")
+            st.markdown(f"**コメント:**\n{selected_template.comment}")
+            if hasattr(selected_template, 'hashtag'):
+                st.markdown(f"**ハッシュタグ:** {selected_template.hashtag}")
+
+
 def display_template_choices(results):
     """テンプレート選択画面を表示する"""
     if not results:
@@ -478,95 +636,50 @@ def display_template_choices(results):
         return
     
     # セッション状態の初期化 (必要な場合)
-    if not has_session_key(SESSION_TEMPLATE_CHOICES):
-        set_session_value(SESSION_TEMPLATE_CHOICES, {})
-    
-    if not has_session_key(SESSION_USER_SELECTIONS):
-        set_session_value(SESSION_USER_SELECTIONS, {})
-    
+    # setdefaultはセッション内の辞書そのものを返すため、以降はローカル参照を直接更新すればよい
+    template_choices = st.session_state.setdefault(SESSION_TEMPLATE_CHOICES, {})
+    user_selections = st.session_state.setdefault(SESSION_USER_SELECTIONS, {})
+    template_titles_map = st.session_state.setdefault(SESSION_TEMPLATE_TITLES, {})
+
     # 画像ごとのテンプレート選択肢を表示
     st.header("テンプレートの選択")
     st.markdown("各画像について、最適なテンプレートを選択してください。AIが選んだ最善のオプションが最初に表示されます。")
-    
-    # 画像ごとに選択肢を表示
-    for i, result in enumerate(results):
-        image_name = result.image_name
-        
-        # すでに選択肢がセッションに保存されていなければ追加
-        template_choices = get_session_value(SESSION_TEMPLATE_CHOICES, {})
-        
-        if image_name not in template_choices:
-            # 選択肢を作成: デフォルトと代替テンプレート
-            templates = [result.selected_template] + result.alternative_templates
-            # 辞書全体を更新せず、特定のキーだけを更新
-            template_choices[image_name] = templates
-            set_session_value(SESSION_TEMPLATE_CHOICES, template_choices)
-        
-        # 選択肢を取得
-        templates = get_session_value(SESSION_TEMPLATE_CHOICES)[image_name]
-        
-        # 画像ごとにエクスパンダーを表示
-        with st.expander(f"画像 {i+1}: {image_name}", expanded=(i==0)):
-            cols = st.columns([1, 2])
-            
-            with cols[0]:
-                # 画像を表示（可能な場合）
-                if hasattr(result, 'image_data') and result.image_data:
-                    try:
-                        st.image(result.image_data, caption=f"画像: {image_name}", use_column_width=True)
-                    except Exception as e:
-                        st.error(f"画像の表示中にエラーが発生しました: {str(e)}")
-                elif hasattr(result, 'image_path') and result.image_path:
-                    try:
-                        st.image(result.image_path, caption=f"画像: {image_name}", use_column_width=True)
-                    except Exception as e:
-                        st.error(f"画像ファイルの表示中にエラーが発生しました: {str(e)}")
-                else:
-                    st.info("画像データが利用できません")
-            
-            with cols[1]:
-                # 選択肢のタイトルをラジオボタン用に準備
-                template_titles = []
-                for j, template in enumerate(templates):
-                    prefix = "🌟 AIおすすめ: " if j == 0 else f"選択肢 {j}: "
-                    template_titles.append(f"{prefix}{template.title}")
-                
-                # ユーザー選択のデフォルト値を設定
-                user_selections = get_session_value(SESSION_USER_SELECTIONS, {})
-                default_idx = user_selections.get(image_name, 0)
-                
-                # テンプレート選択用のラジオボタン
-                selected_idx = st.radio(
-                    "テンプレートを選択してください",
-                    options=range(len(template_titles)),
-                    format_func=lambda i: template_titles[i],
-                    index=default_idx,
-                    key=f"template_radio_{image_name}"
-                )
-                
-                # 選択をセッションに保存
-                user_selections[image_name] = selected_idx
-                set_session_value(SESSION_USER_SELECTIONS, user_selections)
-                
-                # 選択されたテンプレート情報を表示
-                selected_template = templates[selected_idx]
-                st.markdown("### 選択されたテンプレート情報")
-                st.markdown(f"**カテゴリ:** {selected_template.category}")
-                st.markdown(f"**タイトル:** {selected_template.title}")
-                st.markdown(f"**メニュー:** {selected_template.menu}")
-                st.markdown(f"**コメント:**\n{selected_template.comment}")
-                if hasattr(selected_template, 'hashtag'):
-                    st.markdown(f"**ハッシュタグ:** {selected_template.hashtag}")
-    
-    # 確定ボタン
-    st.write("すべての選択内容に問題がなければ、確定ボタンを押してください。")
-    if st.button("テンプレート選択を確定する", type="primary"):
+
+    # 全ラジオボタンと確定ボタンを1つのフォームにまとめることで、個々の
+    # ラジオ操作では再実行が発生せず、フォーム送信時に1回だけ再実行される
+    with st.form("template_selection"):
+        # 画像ごとに選択肢を表示
+        for i, result in enumerate(results):
+            image_name = result.image_name
+
+            # すでに選択肢がセッションに保存されていなければ追加
+            if image_name not in template_choices:
+                # 選択肢を作成: デフォルトと代替テンプレート
+                template_choices[image_name] = [result.selected_template] + result.alternative_templates
+
+            # 選択肢を取得
+            templates = template_choices[image_name]
+
+            # ラジオボタン用のタイトルは初回のみ整形し、以降の再実行では整形済みのものを使う
+            if image_name not in template_titles_map:
+                template_titles_map[image_name] = [
+                    f"{'🌟 AIおすすめ: ' if j == 0 else f'選択肢 {j}: '}{template.title}"
+                    for j, template in enumerate(templates)
+                ]
+
+            _render_template_choice(i, result)
+
+        # 確定ボタン（フォーム送信）
+        st.write("すべての選択内容に問題がなければ、確定ボタンを押してください。")
+        submitted = st.form_submit_button("テンプレート選択を確定する", type="primary")
+
+    if submitted:
         # ユーザー選択をもとに、各ResultのテンプレートをUpdated
         for result in results:
             image_name = result.image_name
-            if image_name in get_session_value(SESSION_USER_SELECTIONS):
-                selected_idx = get_session_value(SESSION_USER_SELECTIONS)[image_name]
-                templates = get_session_value(SESSION_TEMPLATE_CHOICES)[image_name]
+            if image_name in user_selections:
+                selected_idx = user_selections[image_name]
+                templates = template_choices[image_name]
                 if 0 <= selected_idx < len(templates):
                     result.user_selected_template = templates[selected_idx]
         
@@ -579,25 +692,42 @@ def display_template_choices(results):
         st.success("テンプレート選択を確定しました!")
         st.balloons()  # 視覚的な演出
 
+# 結果サマリーテーブルの列定義
+RESULT_DATAFRAME_COLUMNS = ("画像", "カテゴリ", "スタイル", "メニュー", "コメント", "ハッシュタグ")
+
+
+@st.cache_data
+def _build_results_dataframe(rows: tuple) -> pd.DataFrame:
+    """行タプルからDataFrameを構築する（rowsが変わらない限り再実行時はキャッシュを返す）
+
+    pandasの行単位変換を避けるため、列ごとのリストにまとめて一括で構築します。
+    """
+    if not rows:
+        return pd.DataFrame(columns=list(RESULT_DATAFRAME_COLUMNS))
+    columns = zip(*rows)
+    return pd.DataFrame({name: list(values) for name, values in zip(RESULT_DATAFRAME_COLUMNS, columns)})
+
+
 def convert_results_to_dataframe(results):
     """処理結果をDataFrameに変換する"""
     try:
-        data = []
+        # Streamlitがハッシュ可能なイミュータブルな行タプルに変換してキャッシュ関数に渡す
+        rows = []
         for result in results:
-            # 画像ごとの情報を抽出
-            template = result.selected_template
-            row = {
-                "画像": result.image_name,
-                "カテゴリ": template.category if template else "未選択",
-                "スタイル": template.title if template else "未選択",
-                "メニュー": template.menu if template else "未設定",
-                "コメント": template.comment if template else "未設定",
-                "ハッシュタグ": template.hashtag if (template and hasattr(template, 'hashtag')) else "なし"
-            }
-            data.append(row)
-        
-        # DataFrameに変換
-        return pd.DataFrame(data)
+            # 画像ごとの情報を抽出（ユーザーが選択したテンプレートがあれば優先。
+            # 選択の変更が行タプルに反映されるため、キャッシュも正しく無効化される）
+            template = getattr(result, 'user_selected_template', None) or result.selected_template
+            rows.append((
+                result.image_name,
+                template.category if template else "未選択",
+                template.title if template else "未選択",
+                template.menu if template else "未設定",
+                template.comment if template else "未設定",
+                template.hashtag if (template and hasattr(template, 'hashtag')) else "なし"
+            ))
+
+        # DataFrameに変換（同じ結果セットに対する再実行ではキャッシュが返る）
+        return _build_results_dataframe(tuple(rows))
     except Exception as e:
         logging.error(f"DataFrameへの変換中にエラーが発生しました: {e}")
         st.error(f"データの変換中にエラーが発生しました: {str(e)}")
@@ -616,23 +746,42 @@ def display_image_details(results):
     st.subheader("画像ごとの詳細")
     
     for i, result in enumerate(results):
-        with st.expander(f"画像 {i+1}: {result.image_name}", expanded=i == 0):
+        # 展開状態をセッションで追跡し、折りたたまれた画像のエンコードを遅延する
+        expanded = st.session_state.get(f"_expanded_{result.image_name}", i == 0)
+        with st.expander(f"画像 {i+1}: {result.image_name}", expanded=expanded):
             # 1行2列のレイアウト
             col1, col2 = st.columns([1, 2])
-            
+
             with col1:
                 # 画像を表示
                 if hasattr(result, 'image_data') and result.image_data is not None:
-                    try:
-                        # PILイメージをバイトストリームに変換
-                        img_byte_arr = io.BytesIO()
-                        result.image_data.save(img_byte_arr, format=result.image_data.format or 'JPEG')
-                        img_byte_arr.seek(0)
-                        
-                        # 画像を表示
-                        st.image(img_byte_arr, caption=result.image_name, use_column_width=True)
-                    except Exception as e:
-                        st.error(f"画像の表示中にエラーが発生しました: {str(e)}")
+                    thumb_bytes = getattr(result, '_thumb_bytes', None)
+                    if thumb_bytes is None and not expanded:
+                        # 折りたたみ中はエンコードせず、表示を要求されたときに実行する
+                        if st.button("画像を表示", key=f"show_detail_image_{i}"):
+                            st.session_state[f"_expanded_{result.image_name}"] = True
+                            st.rerun()
+                    else:
+                        try:
+                            if thumb_bytes is None:
+                                # フル解像度のままエンコードせず、表示サイズまで縮小してから変換する
+                                # （copy()+thumbnail()は元画像の全コピーと縮小の2回バッファを
+                                # 走査するため、resize()で縮小画像を直接生成する）
+                                source = result.image_data
+                                scale = min(800 / source.width, 800 / source.height, 1.0)
+                                target = (max(1, int(source.width * scale)), max(1, int(source.height * scale)))
+                                thumb = source.resize(target, Image.LANCZOS)
+                                if thumb.mode in ('RGBA', 'P'):
+                                    thumb = thumb.convert('RGB')
+                                img_byte_arr = io.BytesIO()
+                                thumb.save(img_byte_arr, format='JPEG', quality=85)
+                                thumb_bytes = img_byte_arr.getvalue()
+                                result._thumb_bytes = thumb_bytes
+
+                            # 画像を表示
+                            st.image(thumb_bytes, caption=result.image_name, use_column_width=True)
+                        except Exception as e:
+                            st.error(f"画像の表示中にエラーが発生しました: {str(e)}")
                 else:
                     st.warning("画像データがありません")
             
@@ -675,24 +824,43 @@ def display_export_buttons():
     
     # 2列のレイアウト
     col1, col2 = st.columns(2)
-    
+
+    # ファイル名のタイムスタンプは両ボタンで共有する
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
     with col1:
         # Excelエクスポートボタン
-        generate_excel_download(processor, results, "エクスポート可能")
+        generate_excel_download(processor, results, "エクスポート可能", timestamp=ts)
     
     with col2:
         # テキストエクスポートボタン
-        generate_text_download(processor, results, "エクスポート可能")
+        generate_text_download(processor, results, "エクスポート可能", timestamp=ts)
 
 def display_results(results):
     """処理結果を表示する（分割された関数を呼び出す）"""
     if not results or len(results) == 0:
         st.warning("表示する結果がありません。")
         return
-    
-    # 結果をDataFrameに変換
-    df = convert_results_to_dataframe(results)
-    
+
+    # 結果の内容が前回の描画から変わっていなければ、行の抽出とDataFrameの
+    # 再構築をスキップして前回のDataFrameをそのまま使う（Streamlitの実行
+    # モデル上、描画自体は再実行のたびに必要なため省略できない）
+    signature = tuple(
+        (
+            result.image_name,
+            result.selected_template.title if result.selected_template else None,
+            result.user_selected_template.title if getattr(result, 'user_selected_template', None) else None,
+        )
+        for result in results
+    )
+    cached = st.session_state.get("_results_dataframe")
+    if cached is not None and cached[0] == signature:
+        df = cached[1]
+    else:
+        # 結果をDataFrameに変換
+        df = convert_results_to_dataframe(results)
+        st.session_state["_results_dataframe"] = (signature, df)
+
     # サマリーテーブルの表示
     display_summary_table(df)
     
@@ -740,8 +908,24 @@ async def fetch_salon_data(url, config_manager):
         return None, None
 
 
+@st.cache_data(show_spinner=False, hash_funcs={ConfigManager: lambda cm: cm.config_hash})
+def _sidebar_defaults(config_manager):
+    """サイドバーウィジェットの初期値を設定から取得する
+
+    ウィジェット自体はキャッシュせず、ウィジェットに渡す純粋なデータのみを
+    キャッシュします。設定内容が変わるまで再計算されません。
+    """
+    return {
+        "base_url": config_manager.scraper.base_url,
+        "batch_size": config_manager.processing.batch_size,
+        "api_delay": config_manager.processing.api_delay,
+        "cache_ttl_days": config_manager.cache.ttl_days,
+    }
+
+
 def render_sidebar(config_manager):
     """サイドバーの表示"""
+    defaults = _sidebar_defaults(config_manager)
     with st.sidebar:
         st.title("設定")
         
@@ -749,7 +933,7 @@ def render_sidebar(config_manager):
         st.header("サロン設定")
         salon_url = st.text_input(
             "ホットペッパービューティURL",
-            value=get_session_value(SESSION_SALON_URL, config_manager.scraper.base_url),
+            value=get_session_value(SESSION_SALON_URL, defaults["base_url"]),
             help="サロンのホットペッパービューティURLを入力してください。"
         )
         
@@ -764,7 +948,7 @@ def render_sidebar(config_manager):
                 st.error("有効なホットペッパービューティURLを入力してください。")
             else:
                 # 非同期でサロンデータを取得
-                asyncio.run(fetch_salon_data(salon_url, config_manager))
+                _run_async(fetch_salon_data(salon_url, config_manager))
         
         # スタイリストとクーポン情報を表示
         if has_session_key(SESSION_STYLISTS) and has_session_key(SESSION_COUPONS):
@@ -797,7 +981,7 @@ def render_sidebar(config_manager):
                 "バッチサイズ",
                 min_value=1,
                 max_value=10,
-                value=config_manager.processing.batch_size,
+                value=defaults["batch_size"],
                 help="一度に処理する画像の数です。大きすぎるとメモリ不足になる可能性があります。"
             )
             
@@ -806,7 +990,7 @@ def render_sidebar(config_manager):
                 "API遅延（秒）",
                 min_value=0.1,
                 max_value=5.0,
-                value=config_manager.processing.api_delay,
+                value=defaults["api_delay"],
                 step=0.1,
                 help="API呼び出し間の遅延時間です。小さすぎるとレート制限に達する可能性があります。"
             )
@@ -816,7 +1000,7 @@ def render_sidebar(config_manager):
                 "キャッシュ有効期間（日）",
                 min_value=1,
                 max_value=30,
-                value=config_manager.cache.ttl_days,
+                value=defaults["cache_ttl_days"],
                 help="キャッシュの有効期間です。長すぎると古い結果が返される可能性があります。"
             )
             
@@ -868,94 +1052,82 @@ def render_sidebar(config_manager):
             set_session_value(SESSION_PROCESSOR, processor)
         
 
+# 辞書からProcessResultを構築する際の必須サブモデルのデフォルト値
+_PROCESS_RESULT_DEFAULTS = {
+    "style_analysis": {
+        "category": "",
+        "features": {"color": "", "cut_technique": "", "styling": "", "impression": ""},
+        "keywords": [],
+    },
+    "attribute_analysis": {"sex": "", "length": ""},
+    "selected_template": {"category": "", "title": "", "menu": "", "comment": "", "hashtag": ""},
+    "selected_stylist": {"name": "", "specialties": "", "description": ""},
+    "selected_coupon": {"name": "", "price": 0, "description": ""},
+}
+
+
+def _structure_process_result(data):
+    """辞書をProcessResultに変換する
+
+    欠損しているフィールドをデフォルト値で補完し、フィールドごとの検証は
+    Pydanticのコンパイル済みバリデーションコアに一括で委譲します。
+    """
+    payload = dict(data)
+    for key, defaults in _PROCESS_RESULT_DEFAULTS.items():
+        value = payload.get(key)
+        merged = {**defaults, **(value if isinstance(value, dict) else {})}
+        if key == "style_analysis":
+            features = merged.get("features")
+            merged["features"] = {
+                **_PROCESS_RESULT_DEFAULTS["style_analysis"]["features"],
+                **(features if isinstance(features, dict) else {}),
+            }
+        payload[key] = merged
+    payload.setdefault("image_name", "")
+    for reason_key in ("stylist_reason", "coupon_reason", "template_reason"):
+        payload.setdefault(reason_key, "")
+    return ProcessResult.model_validate(payload)
+
+
 def convert_to_process_results(results):
     """結果をProcessResultオブジェクトに変換する関数"""
-    from hairstyle_analyzer.data.models import ProcessResult, StyleAnalysis, AttributeAnalysis, Template, StylistInfo, CouponInfo, StyleFeatures
-    
+    # process_imagesの結果をそのままダウンロードする典型ケースでは全件が
+    # すでにProcessResultのため、走査のみで変換ループを省略する
+    if results and all(type(result) is ProcessResult for result in results):
+        return results
+
+    # 例外ハンドラはループの外に1つだけ置き、失敗した要素をスキップして
+    # その次の要素から再開する（正常系で反復ごとのハンドラ設定を避ける）
     process_results = []
-    for result in results:
+    index = 0
+    while index < len(results):
         try:
-            if isinstance(result, dict):
-                # 辞書の場合はProcessResultオブジェクトに変換
-                # 必要なオブジェクトを作成
-                image_name = result.get("image_name", "")
-                
-                # StyleAnalysisの作成
-                style_analysis_dict = result.get("style_analysis", {})
-                features_dict = style_analysis_dict.get("features", {}) if isinstance(style_analysis_dict, dict) else {}
-                
-                features = StyleFeatures(
-                    color=features_dict.get("color", ""),
-                    cut_technique=features_dict.get("cut_technique", ""),
-                    styling=features_dict.get("styling", ""),
-                    impression=features_dict.get("impression", "")
-                )
-                
-                style_analysis = StyleAnalysis(
-                    category=style_analysis_dict.get("category", "") if isinstance(style_analysis_dict, dict) else "",
-                    features=features,
-                    keywords=style_analysis_dict.get("keywords", []) if isinstance(style_analysis_dict, dict) else []
-                )
-                
-                # AttributeAnalysisの作成
-                attribute_analysis_dict = result.get("attribute_analysis", {})
-                attribute_analysis = AttributeAnalysis(
-                    sex=attribute_analysis_dict.get("sex", "") if isinstance(attribute_analysis_dict, dict) else "",
-                    length=attribute_analysis_dict.get("length", "") if isinstance(attribute_analysis_dict, dict) else ""
-                )
-                
-                # Templateの作成
-                template_dict = result.get("selected_template", {})
-                template = Template(
-                    category=template_dict.get("category", "") if isinstance(template_dict, dict) else "",
-                    title=template_dict.get("title", "") if isinstance(template_dict, dict) else "",
-                    menu=template_dict.get("menu", "") if isinstance(template_dict, dict) else "",
-                    comment=template_dict.get("comment", "") if isinstance(template_dict, dict) else "",
-                    hashtag=template_dict.get("hashtag", "") if isinstance(template_dict, dict) else ""
-                )
-                
-                # StylistInfoの作成
-                stylist_dict = result.get("selected_stylist", {})
-                stylist = StylistInfo(
-                    name=stylist_dict.get("name", "") if isinstance(stylist_dict, dict) else "",
-                    specialties=stylist_dict.get("specialties", "") if isinstance(stylist_dict, dict) else "",
-                    description=stylist_dict.get("description", "") if isinstance(stylist_dict, dict) else ""
-                )
-                
-                # CouponInfoの作成
-                coupon_dict = result.get("selected_coupon", {})
-                coupon = CouponInfo(
-                    name=coupon_dict.get("name", "") if isinstance(coupon_dict, dict) else "",
-                    price=coupon_dict.get("price", 0) if isinstance(coupon_dict, dict) else 0,
-                    description=coupon_dict.get("description", "") if isinstance(coupon_dict, dict) else ""
-                )
-                
-                # ProcessResultの作成
-                process_result = ProcessResult(
-                    image_name=image_name,
-                    style_analysis=style_analysis,
-                    attribute_analysis=attribute_analysis,
-                    selected_template=template,
-                    selected_stylist=stylist,
-                    selected_coupon=coupon,
-                    stylist_reason=result.get("stylist_reason", ""),
-                    coupon_reason=result.get("coupon_reason", ""),
-                    template_reason=result.get("template_reason", "")
-                )
-                
-                process_results.append(process_result)
-            else:
-                # すでにProcessResultオブジェクトの場合はそのまま追加
-                process_results.append(result)
-        except Exception as e:
-            logging.error(f"結果変換中にエラーが発生しました: {str(e)}")
-            import traceback
-            logging.error(traceback.format_exc())
-            # エラーが発生しても他の結果を続行
-            continue
-    
+            for index in range(index, len(results)):
+                result = results[index]
+                if isinstance(result, dict):
+                    # 辞書の場合はProcessResultオブジェクトに変換
+                    process_results.append(_structure_process_result(result))
+                else:
+                    # すでにProcessResultオブジェクトの場合はそのまま追加
+                    process_results.append(result)
+            break
+        except Exception:
+            logging.exception(f"結果変換中にエラーが発生しました (インデックス {index})")
+            index += 1
+
     return process_results
 
+
+@st.cache_data(show_spinner=False, hash_funcs={list: lambda results: (id(results), len(results))})
+def _cached_convert_to_process_results(results):
+    """convert_to_process_resultsの結果を再実行間でメモ化するラッパー
+
+    結果リストはセッションステート内で同一オブジェクトとして保持されるため、
+    idと要素数の組でハッシュすれば、追記のない再実行では変換をスキップできます。
+    """
+    return convert_to_process_results(results)
+
+
 def generate_excel_data(results):
     """結果データからExcelバイナリデータを生成する"""
     try:
@@ -991,7 +1163,7 @@ def generate_text_data(results):
             return None
         
         # 結果をProcessResultオブジェクトに変換
-        process_results = convert_to_process_results(results)
+        process_results = _cached_convert_to_process_results(results)
         
         # テキストデータを生成
         text_data = processor.text_exporter.get_text_content(process_results)
@@ -999,20 +1171,19 @@ def generate_text_data(results):
         return text_data
     except Exception as e:
         logging.error(f"テキスト変換中にエラーが発生: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         st.error(f"テキスト生成エラー: {str(e)}")
         return None
 
-def download_excel(excel_data):
+def download_excel(excel_data, timestamp=None):
     """Excelファイルをダウンロードするボタンを表示する関数"""
     if excel_data is None:
         st.warning("ダウンロードするExcelデータがありません。")
         return False
     
     try:
-        # ファイル名を生成
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # ファイル名を生成（呼び出し元から渡されなければここで1回だけ生成）
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"hairstyle_analysis_{timestamp}.xlsx"
         
         # ダウンロードボタンを表示
@@ -1027,20 +1198,19 @@ def download_excel(excel_data):
         return True
     except Exception as e:
         logging.error(f"Excelダウンロード中にエラーが発生: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         st.error(f"Excelダウンロードエラー: {str(e)}")
         return False
 
-def download_text(text_data):
+def download_text(text_data, timestamp=None):
     """テキストファイルをダウンロードするボタンを表示する関数"""
     if text_data is None:
         st.warning("ダウンロードするテキストデータがありません。")
         return False
     
     try:
-        # ファイル名を生成
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        # ファイル名を生成（呼び出し元から渡されなければここで1回だけ生成）
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"hairstyle_analysis_{timestamp}.txt"
         
         # ダウンロードボタンを表示
@@ -1055,23 +1225,57 @@ def download_text(text_data):
         return True
     except Exception as e:
         logging.error(f"テキストダウンロード中にエラーが発生: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         st.error(f"テキストダウンロードエラー: {str(e)}")
         return False
 
-def generate_excel_download(processor, results, title="タイトル生成が完了しました。"):
+def _export_results_signature(results):
+    """エクスポートキャッシュ用の結果シグネチャを計算する
+
+    結果リストには辞書とProcessResultが混在し得るため、両方に対応した
+    （画像名、選択テンプレートタイトル、ユーザー選択タイトル）の組で
+    内容を識別します。display_resultsのDataFrameキャッシュと同じ方式です。
+    """
+    signature = []
+    for result in results:
+        if isinstance(result, dict):
+            selected = result.get("selected_template")
+            user_selected = result.get("user_selected_template")
+            signature.append((
+                result.get("image_name"),
+                selected.get("title") if isinstance(selected, dict) else getattr(selected, "title", None),
+                user_selected.get("title") if isinstance(user_selected, dict) else getattr(user_selected, "title", None),
+            ))
+        else:
+            signature.append((
+                result.image_name,
+                result.selected_template.title if result.selected_template else None,
+                result.user_selected_template.title if getattr(result, "user_selected_template", None) else None,
+            ))
+    return tuple(signature)
+
+
+def generate_excel_download(processor, results, title="タイトル生成が完了しました。", timestamp=None):
     """プロセッサーを使用してExcelファイルを生成し、ダウンロードボタンを表示する関数"""
     try:
         # Excelデータを生成または取得
         excel_data = None
         
         if processor and hasattr(processor, 'excel_exporter'):
-            # 結果をProcessResultオブジェクトに変換してプロセッサーに追加
-            process_results = convert_to_process_results(results)
-            
-            # 直接エクスポーターを使用してExcelデータを生成
-            excel_data = processor.excel_exporter.get_binary_data(process_results)
+            # 同じ内容の結果に対するワークブック構築は1回だけ行い、再実行時は
+            # セッションに保存したバイト列を使い回す。キーは固定で、新しい
+            # バッチでは上書きされるため古いエントリが残ることはない
+            signature = _export_results_signature(results)
+            cached = get_session_value("_excel_bytes_cache")
+            if cached is not None and cached[0] == signature:
+                excel_data = cached[1]
+            else:
+                # 結果をProcessResultオブジェクトに変換
+                process_results = convert_to_process_results(results)
+
+                # 直接エクスポーターを使用してExcelデータを生成
+                excel_data = processor.excel_exporter.get_binary_data(process_results)
+                set_session_value("_excel_bytes_cache", (signature, excel_data))
         else:
             # プロセッサーがない場合は警告を表示
             st.warning("Excel出力のためのプロセッサーが利用できません。")
@@ -1081,7 +1285,7 @@ def generate_excel_download(processor, results, title="タイトル生成が完
             return False
         
         # Excel用ダウンロードボタンを表示
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"hairstyle_analysis_{timestamp}.xlsx"
         
         # 目立つスタイルでダウンロードボタンを表示（カラム数を2にする）
@@ -1104,23 +1308,31 @@ def generate_excel_download(processor, results, title="タイトル生成が完
     
     except Exception as e:
         logging.error(f"Excel出力中にエラーが発生しました: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         st.error(f"Excel出力中にエラーが発生しました: {str(e)}")
         return False
 
-def generate_text_download(processor, results, title="タイトル生成が完了しました。"):
+def generate_text_download(processor, results, title="タイトル生成が完了しました。", timestamp=None):
     """プロセッサーを使用してテキストファイルを生成し、ダウンロードボタンを表示する関数"""
     try:
         # テキストデータを生成または取得
         text_data = None
         
         if processor and hasattr(processor, 'text_exporter'):
-            # 結果をProcessResultオブジェクトに変換してプロセッサーに追加
-            process_results = convert_to_process_results(results)
-            
-            # 直接エクスポーターを使用してテキストデータを生成
-            text_data = processor.text_exporter.get_text_content(process_results)
+            # 同じ内容の結果に対するテキスト生成は1回だけ行い、再実行時は
+            # セッションに保存した内容を使い回す。キーは固定で、新しい
+            # バッチでは上書きされるため古いエントリが残ることはない
+            signature = _export_results_signature(results)
+            cached = get_session_value("_text_data_cache")
+            if cached is not None and cached[0] == signature:
+                text_data = cached[1]
+            else:
+                # 結果をProcessResultオブジェクトに変換
+                process_results = convert_to_process_results(results)
+
+                # 直接エクスポーターを使用してテキストデータを生成
+                text_data = processor.text_exporter.get_text_content(process_results)
+                set_session_value("_text_data_cache", (signature, text_data))
         else:
             # プロセッサーがない場合は警告を表示
             st.warning("テキスト出力のためのプロセッサーが利用できません。")
@@ -1130,7 +1342,7 @@ def generate_text_download(processor, results, title="タイトル生成が完
             return False
         
         # テキスト用ダウンロードボタンを表示
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"hairstyle_analysis_{timestamp}.txt"
         
         # 目立つスタイルでダウンロードボタンを表示（カラム数を2にする）
@@ -1153,17 +1365,212 @@ def generate_text_download(processor, results, title="タイトル生成が完
     
     except Exception as e:
         logging.error(f"テキスト出力中にエラーが発生しました: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         st.error(f"テキスト出力中にエラーが発生しました: {str(e)}")
         return False
 
+@st.fragment
+def _run_processing(processor, image_paths):
+    """画像処理の実行・進捗表示・結果出力を行うフラグメント
+
+    フラグメントとして分離することで、進捗ウィジェットの更新が設定や
+    アップロード処理を含むページ全体の再実行を引き起こさなくなります。
+    """
+    # プログレスバーの表示
+    progress_container = st.container()
+    with progress_container:
+        # プログレスバーのスタイル改善
+        st.markdown("""
+        <style>
+            .stProgress > div > div {
+                background-color: #4CAF50;
+                transition: width 0.3s ease;
+            }
+            .progress-label {
+                font-size: 16px;
+                font-weight: bold;
+                margin-bottom: 5px;
+            }
+        </style>
+        """, unsafe_allow_html=True)
+
+        # プログレスバーのラベル表示
+        st.markdown('<p class="progress-label">画像処理の進捗状況</p>', unsafe_allow_html=True)
+
+        # プログレスバーと状態テキスト（状態と時間情報は1つのスロットにまとめて描画する）
+        progress_bar = st.progress(0)
+        status_slot = st.empty()
+
+    # 初期化
+    processor = get_session_value(SESSION_PROCESSOR)
+
+    # 非同期処理を実行
+    with st.spinner("画像を処理中..."):
+        # 最後に描画した時刻（コールバックの描画を最大10Hzに間引くためのゲート）
+        last_render = [0.0]
+
+        # 進捗コールバック関数
+        def update_progress_callback(current, total, message=""):
+            # 短時間に連続するティックは描画をスキップする（完了ティックは常に描画）
+            now = time.monotonic()
+            if current < total and now - last_render[0] < 0.1:
+                return
+            last_render[0] = now
+
+            # セッションから最新の進捗情報を取得
+            if has_session_key(SESSION_PROGRESS):
+                progress_data = get_session_value(SESSION_PROGRESS)
+                # 処理中の画像のインデックス
+                img_index = progress_data.get("current", 0)
+                # 総画像数
+                total_images = progress_data.get("total", 1)
+
+                # 各画像の進捗を5ステップに分割
+                # 画像ごとの処理進捗を計算（0-1の範囲）
+                image_progress = float(current) / float(total) if total > 0 else 0
+
+                # 全体の進捗を計算（0-1の範囲）
+                # 前の画像はすでに完了（各1.0）、現在の画像は部分的に完了（0.0-1.0）
+                overall_progress = (img_index + image_progress) / total_images
+
+                # 進捗状況のテキスト
+                percentage = int(overall_progress * 100)
+                status_md = f"**処理中**: 画像 {img_index+1}/{total_images} ({percentage}%)<br>**状態**: {message}"
+
+                # 経過時間と推定残り時間の表示
+                if "start_time" in progress_data:
+                    elapsed = time.time() - progress_data["start_time"]
+
+                    # 経過時間のフォーマット
+                    if elapsed < 60:
+                        elapsed_str = f"{elapsed:.1f}秒"
+                    else:
+                        minutes = int(elapsed // 60)
+                        seconds = int(elapsed % 60)
+                        elapsed_str = f"{minutes}分{seconds}秒"
+
+                    time_info = f"**経過時間**: {elapsed_str}<br>"
+
+                    # 処理速度と残り時間の計算（現在の画像も考慮）
+                    # 完了した画像 + 現在の画像の進捗
+                    completed_progress = img_index + image_progress
+                    if completed_progress > 0:
+                        # 1画像あたりの平均秒数
+                        avg_seconds_per_image = elapsed / completed_progress
+                        # 残りの画像数
+                        remaining_images = total_images - completed_progress
+                        # 残り時間の予測
+                        remaining = avg_seconds_per_image * remaining_images
+
+                        # 処理速度の表示
+                        images_per_minute = 60 / avg_seconds_per_image
+                        if images_per_minute < 1:
+                            speed_str = f"{images_per_minute*60:.1f} 画像/時間"
+                        else:
+                            speed_str = f"{images_per_minute:.1f} 画像/分"
+
+                        time_info += f"**処理速度**: {speed_str}<br>"
+
+                        # 残り時間の表示
+                        if remaining < 60:
+                            remaining_str = f"{remaining:.1f}秒"
+                        else:
+                            minutes = int(remaining // 60)
+                            seconds = int(remaining % 60)
+                            remaining_str = f"{minutes}分{seconds}秒"
+
+                        time_info += f"**推定残り時間**: {remaining_str}"
+
+                    status_md += f"<br>{time_info}"
+
+                # ティックごとの描画はプログレスバーとテキストスロットの2回のみ
+                progress_bar.progress(overall_progress)
+                status_slot.markdown(status_md, unsafe_allow_html=True)
+
+        # スタイリストとクーポンのデータを取得
+        stylists = get_session_value(SESSION_STYLISTS, [])
+        coupons = get_session_value(SESSION_COUPONS, [])
+
+        # スタイリストとクーポンのデータが存在するか確認
+        if not stylists:
+            st.warning("スタイリスト情報が取得されていません。サイドバーの「サロンデータを取得」ボタンを押してデータを取得してください。")
+        if not coupons:
+            st.warning("クーポン情報が取得されていません。サイドバーの「サロンデータを取得」ボタンを押してデータを取得してください。")
+
+        # キャッシュ使用設定の取得
+        use_cache = get_session_value(SESSION_USE_CACHE, True)
+
+        # 完了した画像から順に1行ずつ埋めるプレースホルダー
+        # （全件の完了を待たずに、最初に終わった結果からUIに反映される）
+        result_slots = [st.empty() for _ in image_paths]
+        filled_count = [0]
+
+        def show_partial_result(result):
+            if isinstance(result, dict):
+                image_name = result.get("image_name", "")
+            else:
+                image_name = getattr(result, "image_name", "")
+            result_slots[filled_count[0]].markdown(f"✅ {image_name} の処理が完了しました")
+            filled_count[0] += 1
+
+        # 処理の実行（スタイリストとクーポンのデータとキャッシュ設定を渡す）
+        # 進捗コールバック関数をセット
+        processor.set_progress_callback(lambda current, total, message: update_progress_callback(current, total, message))
+        results = _run_async(process_images(processor, image_paths, stylists, coupons, use_cache, on_result=show_partial_result))
+
+        # 処理完了（途中経過の行は最終結果の表示前にクリアする）
+        for slot in result_slots:
+            slot.empty()
+        progress_bar.progress(1.0)
+        status_slot.markdown("**処理完了**！🎉", unsafe_allow_html=True)
+
+        # 処理詳細の表示
+        if has_session_key(SESSION_PROGRESS) and "stage_details" in get_session_value(SESSION_PROGRESS):
+            with progress_container.expander("処理の詳細を表示", expanded=False):
+                st.write(get_session_value(SESSION_PROGRESS)["stage_details"])
+
+        # 結果が空でないか確認
+        if not results:
+            st.error("画像処理中にエラーが発生しました。ログを確認してください。")
+            return
+
+        # 結果をセッションに保存
+        set_session_value(SESSION_RESULTS, results)
+
+        # 結果表示
+        display_results(results)
+
+        # ここから出力処理を追加
+        try:
+            # プロセッサーがセッションに存在することを確認
+            processor = get_session_value(SESSION_PROCESSOR)
+
+            # 出力形式の選択を削除し、両方の出力を表示
+            # （エクスポーターには結果を直接渡すため、processor.resultsへの
+            # コピーは不要）
+            st.write("### 出力ファイル")
+
+            # 通知メッセージを表示
+            st.success("タイトル生成が完了しました。下のボタンをクリックしてファイルをダウンロードしてください。")
+
+            # ファイル名のタイムスタンプは両ボタンで共有する
+            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+            # Excel出力とダウンロードボタン表示
+            generate_excel_download(processor, results, "タイトル生成が完了しました。", timestamp=ts)
+
+            # テキスト出力とダウンロードボタン表示
+            generate_text_download(processor, results, "タイトル生成が完了しました。", timestamp=ts)
+
+        except Exception as e:
+            logging.error(f"ファイル出力中にエラーが発生しました: {str(e)}")
+            logging.error(traceback.format_exc())
+            st.error(f"ファイル出力中にエラーが発生しました: {str(e)}")
+
+
 def render_main_content():
     """メインコンテンツを表示する関数"""
-    
-    # 必要な関数をローカルスコープにインポート（名前解決エラー回避のため）
-    from hairstyle_analyzer.ui.streamlit_app import convert_to_process_results, generate_excel_download, generate_text_download
-    
+
     # タイトル表示
     st.write("# Style Generator")
     
@@ -1189,10 +1596,10 @@ def render_main_content():
         cols = st.columns(min(4, len(uploaded_files)))
         for i, uploaded_file in enumerate(uploaded_files[:8]):  # 最大8枚まで表示
             with cols[i % 4]:
-                # 画像を開いてリサイズ
-                image = Image.open(uploaded_file)
+                # キャッシュされたサムネイルを表示（再実行時の再デコードを回避）
                 # 画像の最大幅を200pxに制限
-                st.image(image, caption=uploaded_file.name, width=200)
+                thumb_bytes = _preview_thumbnail(uploaded_file.getvalue(), uploaded_file.name)
+                st.image(thumb_bytes, caption=uploaded_file.name, width=200)
         
         # 8枚以上の場合は省略メッセージを表示
         if len(uploaded_files) > 8:
@@ -1231,179 +1638,16 @@ def render_main_content():
                 
                 logging.info(f"{len(image_paths)}枚の画像を一時ディレクトリに保存しました")
                 
-                # プログレスバーの表示
-                progress_container = st.container()
-                with progress_container:
-                    # プログレスバーのスタイル改善
-                    st.markdown("""
-                    <style>
-                        .stProgress > div > div {
-                            background-color: #4CAF50;
-                            transition: width 0.3s ease;
-                        }
-                        .progress-label {
-                            font-size: 16px;
-                            font-weight: bold;
-                            margin-bottom: 5px;
-                        }
-                    </style>
-                    """, unsafe_allow_html=True)
-                    
-                    # プログレスバーのラベル表示
-                    st.markdown('<p class="progress-label">画像処理の進捗状況</p>', unsafe_allow_html=True)
-                    
-                    # プログレスバーと状態テキスト
-                    progress_bar = st.progress(0)
-                    col1, col2 = st.columns(2)
-                    status_text = col1.empty()
-                    time_text = col2.empty()
-                
-                # 初期化
-                processor = get_session_value(SESSION_PROCESSOR)
-                
-                # 非同期処理を実行
-                with st.spinner("画像を処理中..."):
-                    # 進捗コールバック関数
-                    def update_progress_callback(current, total, message=""):
-                        # セッションから最新の進捗情報を取得
-                        if has_session_key(SESSION_PROGRESS):
-                            progress_data = get_session_value(SESSION_PROGRESS)
-                            # 処理中の画像のインデックス
-                            img_index = progress_data.get("current", 0)
-                            # 総画像数
-                            total_images = progress_data.get("total", 1)
-                            
-                            # 各画像の進捗を5ステップに分割
-                            # 画像ごとの処理進捗を計算（0-1の範囲）
-                            image_progress = float(current) / float(total) if total > 0 else 0
-                            
-                            # 全体の進捗を計算（0-1の範囲）
-                            # 前の画像はすでに完了（各1.0）、現在の画像は部分的に完了（0.0-1.0）
-                            overall_progress = (img_index + image_progress) / total_images
-                            
-                            # プログレスバーの更新
-                            progress_bar.progress(overall_progress)
-                            
-                            # 進捗状況のテキスト表示
-                            percentage = int(overall_progress * 100)
-                            status_text.markdown(f"**処理中**: 画像 {img_index+1}/{total_images} ({percentage}%)<br>**状態**: {message}", unsafe_allow_html=True)
-                            
-                            # 経過時間と推定残り時間の表示
-                            if "start_time" in progress_data:
-                                elapsed = time.time() - progress_data["start_time"]
-                                
-                                # 経過時間のフォーマット
-                                if elapsed < 60:
-                                    elapsed_str = f"{elapsed:.1f}秒"
-                                else:
-                                    minutes = int(elapsed // 60)
-                                    seconds = int(elapsed % 60)
-                                    elapsed_str = f"{minutes}分{seconds}秒"
-                                
-                                time_info = f"**経過時間**: {elapsed_str}<br>"
-                                
-                                # 処理速度と残り時間の計算（現在の画像も考慮）
-                                # 完了した画像 + 現在の画像の進捗
-                                completed_progress = img_index + image_progress
-                                if completed_progress > 0:
-                                    # 1画像あたりの平均秒数
-                                    avg_seconds_per_image = elapsed / completed_progress
-                                    # 残りの画像数
-                                    remaining_images = total_images - completed_progress
-                                    # 残り時間の予測
-                                    remaining = avg_seconds_per_image * remaining_images
-                                    
-                                    # 処理速度の表示
-                                    images_per_minute = 60 / avg_seconds_per_image
-                                    if images_per_minute < 1:
-                                        speed_str = f"{images_per_minute*60:.1f} 画像/時間"
-                                    else:
-                                        speed_str = f"{images_per_minute:.1f} 画像/分"
-                                    
-                                    time_info += f"**処理速度**: {speed_str}<br>"
-                                    
-                                    # 残り時間の表示
-                                    if remaining < 60:
-                                        remaining_str = f"{remaining:.1f}秒"
-                                    else:
-                                        minutes = int(remaining // 60)
-                                        seconds = int(remaining % 60)
-                                        remaining_str = f"{minutes}分{seconds}秒"
-                                    
-                                    time_info += f"**推定残り時間**: {remaining_str}"
-                                
-                                time_text.markdown(time_info, unsafe_allow_html=True)
-                    
-                    # スタイリストとクーポンのデータを取得
-                    stylists = get_session_value(SESSION_STYLISTS, [])
-                    coupons = get_session_value(SESSION_COUPONS, [])
-                    
-                    # スタイリストとクーポンのデータが存在するか確認
-                    if not stylists:
-                        st.warning("スタイリスト情報が取得されていません。サイドバーの「サロンデータを取得」ボタンを押してデータを取得してください。")
-                    if not coupons:
-                        st.warning("クーポン情報が取得されていません。サイドバーの「サロンデータを取得」ボタンを押してデータを取得してください。")
-                    
-                    # キャッシュ使用設定の取得
-                    use_cache = get_session_value(SESSION_USE_CACHE, True)
-                    
-                    # 処理の実行（スタイリストとクーポンのデータとキャッシュ設定を渡す）
-                    # 進捗コールバック関数をセット
-                    processor.set_progress_callback(lambda current, total, message: update_progress_callback(current, total, message))
-                    results = asyncio.run(process_images(processor, image_paths, stylists, coupons, use_cache))
-                    
-                    # 処理完了
-                    progress_bar.progress(1.0)
-                    status_text.markdown("**処理完了**！🎉", unsafe_allow_html=True)
-                    
-                    # 処理詳細の表示
-                    if has_session_key(SESSION_PROGRESS) and "stage_details" in get_session_value(SESSION_PROGRESS):
-                        with progress_container.expander("処理の詳細を表示", expanded=False):
-                            st.write(get_session_value(SESSION_PROGRESS)["stage_details"])
-                    
-                    # 結果が空でないか確認
-                    if not results:
-                        st.error("画像処理中にエラーが発生しました。ログを確認してください。")
-                        return
-                    
-                    # 結果をセッションに保存
-                    set_session_value(SESSION_RESULTS, results)
-                    
-                    # 結果表示
-                    display_results(results)
-                    
-                    # ここから出力処理を追加
-                    try:
-                        # プロセッサーがセッションに存在することを確認
-                        processor = get_session_value(SESSION_PROCESSOR)
-                        
-                        # 出力前にプロセッサーの結果をクリアして、新しい結果をセット
-                        processor.clear_results()
-                        process_results = convert_to_process_results(results)
-                        processor.results.extend(process_results)
-                        
-                        # 出力形式の選択を削除し、両方の出力を表示
-                        st.write("### 出力ファイル")
-                        
-                        # 通知メッセージを表示
-                        st.success("タイトル生成が完了しました。下のボタンをクリックしてファイルをダウンロードしてください。")
-                        
-                        # Excel出力とダウンロードボタン表示
-                        generate_excel_download(processor, results, "タイトル生成が完了しました。")
-                        
-                        # テキスト出力とダウンロードボタン表示
-                        generate_text_download(processor, results, "タイトル生成が完了しました。")
-                    
-                    except Exception as e:
-                        logging.error(f"ファイル出力中にエラーが発生しました: {str(e)}")
-                        import traceback
-                        logging.error(traceback.format_exc())
-                        st.error(f"ファイル出力中にエラーが発生しました: {str(e)}")
+                # 処理の実行と進捗表示（フラグメントとして分離）
+                if st_runtime.exists():
+                    _run_processing(processor, image_paths)
+                else:
+                    # ランタイム外ではフラグメントの仕組みが動かないため、元の関数を直接呼ぶ
+                    _run_processing.__wrapped__(processor, image_paths)
             
             except Exception as e:
                 st.error(f"処理中にエラーが発生しました: {str(e)}")
                 logging.error(f"処理中にエラーが発生しました: {str(e)}")
-                import traceback
                 logging.error(traceback.format_exc())
     
     # 結果が既にセッションにある場合は表示
@@ -1417,40 +1661,43 @@ def render_main_content():
                 # セッションからプロセッサーを取得
                 processor = get_session_value(SESSION_PROCESSOR)
                 
-                # 出力前にプロセッサーの結果をクリアして、新しい結果をセット
-                processor.clear_results()
-                process_results = convert_to_process_results(results)
-                processor.results.extend(process_results)
-                
                 # 出力形式の選択を削除し、両方の出力を表示
+                # （エクスポーターには結果を直接渡すため、processor.resultsへの
+                # コピーは不要）
                 st.write("### 出力ファイル")
                 
                 # 通知メッセージを表示
                 st.success("以前の処理結果からファイルを生成できます。下のボタンをクリックしてダウンロードしてください。")
                 
+                # ファイル名のタイムスタンプは両ボタンで共有する
+                ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
                 # Excel出力とダウンロードボタン表示
-                generate_excel_download(processor, results, "以前の処理結果からExcelファイルを生成できます。")
+                generate_excel_download(processor, results, "以前の処理結果からExcelファイルを生成できます。", timestamp=ts)
                 
                 # テキスト出力とダウンロードボタン表示
-                generate_text_download(processor, results, "以前の処理結果からテキストファイルを生成できます。")
+                generate_text_download(processor, results, "以前の処理結果からテキストファイルを生成できます。", timestamp=ts)
             
             except Exception as e:
                 logging.error(f"既存結果からのファイル出力中にエラーが発生しました: {str(e)}")
-                import traceback
                 logging.error(traceback.format_exc())
                 st.error(f"ファイル出力中にエラーが発生しました: {str(e)}")
 
 
+@st.cache_resource(show_spinner=False)
 def get_config_manager():
     """設定マネージャーのインスタンスを取得する"""
-    # セッションから取得を試みる
-    if has_session_key(SESSION_CONFIG):
-        return get_session_value(SESSION_CONFIG)
-    
-    # セッションになければ新規作成
-    config_manager = ConfigManager("config/config.yaml")
-    set_session_value(SESSION_CONFIG, config_manager)
-    return config_manager
+    # cache_resourceによりプロセス内で単一インスタンスとして共有されるため、
+    # YAMLの読み込みと解析は初回呼び出し時の一度だけ行われる
+    return ConfigManager("config/config.yaml")
+
+
+# アップロードファイルの読み書きに使うチャンクサイズ（ピークメモリの上限になる）
+_UPLOAD_CHUNK_BYTES = 128 * 1024
+
+# 保存時に縮小する画像の長辺サイズ（解析・表示とも原寸は不要なため、
+# アップロード時に1回だけ縮小して以降のデコードコストを抑える）
+_UPLOAD_MAX_EDGE = 1024
 
 
 def handle_image_upload(uploaded_files):
@@ -1463,71 +1710,104 @@ def handle_image_upload(uploaded_files):
         temp_dir = Path(os.environ.get("TEMP_DIR", "temp")) / "hairstyle_analyzer"
         temp_dir.mkdir(parents=True, exist_ok=True)
         
-        # 前回の一時ファイルをクリーンアップ
+        # 前回の一時ファイルをクリーンアップ（ファイルごとのstat+unlinkを避けて
+        # ディレクトリごと作り直す）
         try:
-            for old_file in temp_dir.glob("*"):
-                if old_file.is_file():
-                    old_file.unlink()
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            temp_dir.mkdir(parents=True, exist_ok=True)
             logging.info("前回の一時ファイルをクリーンアップしました")
         except Exception as e:
             logging.warning(f"一時ファイルのクリーンアップ中にエラー: {str(e)}")
         
-        # 画像ファイルの保存
-        image_paths = []
-        for i, file in enumerate(uploaded_files):
+        # 重複検出用の保存済みパス集合（ワーカースレッド間で共有する）
+        seen_paths = set()
+        seen_lock = threading.Lock()
+
+        def _save_and_prep(file):
+            """1ファイル分の保存・検証・縮小を行う（ワーカースレッドで実行）
+
+            成功した場合は保存先パスの文字列を、スキップ・失敗した場合はNoneを返します。
+            """
             try:
                 # ファイル名の取得（拡張子を含む）
                 original_filename = file.name
                 file_ext = Path(original_filename).suffix.lower()
-                
+
                 # ファイル拡張子の検証
                 if file_ext not in ['.jpg', '.jpeg', '.png']:
                     logging.warning(f"サポートされていないファイル形式: {file_ext}")
-                    continue
-                
-                # 安全なファイル名の生成
-                safe_filename = f"styleimg_{i+1}{file_ext}"
+                    return None
+
+                # 安全なファイル名の生成（内容のダイジェストをキーにすることで、
+                # 同一内容の重複アップロードを保存・解析前に検出できる。キャッシュの
+                # キーも内容に対して安定する）
+                hasher = hashlib.blake2b(digest_size=16)
+                file.seek(0)
+                for chunk in iter(lambda: file.read(_UPLOAD_CHUNK_BYTES), b""):
+                    hasher.update(chunk)
+                safe_filename = f"styleimg_{hasher.hexdigest()}{file_ext}"
                 temp_path = temp_dir / safe_filename
-                
-                # ファイルの保存
+
+                # 同一内容のファイルがすでに保存済みの場合は再保存・再検証をスキップ
+                with seen_lock:
+                    if str(temp_path) in seen_paths:
+                        logging.info(f"重複した画像のためスキップします: {original_filename}")
+                        return None
+                    seen_paths.add(str(temp_path))
+
+                # ファイルの保存（全体を一括でコピーせず、チャンク単位で書き出して
+                # ピークメモリをファイルサイズに依存させない）
+                file.seek(0)
                 with open(temp_path, "wb") as f:
-                    f.write(file.getbuffer())
-                
-                # 画像の検証
+                    shutil.copyfileobj(file, f, length=_UPLOAD_CHUNK_BYTES)
+
+                # 画像の検証と縮小（1回のオープンでデコード検証と長辺1024pxへの
+                # 縮小まで行う。解析と表示のどちらも原寸を必要としないため、
+                # ここで1回縮小しておけば以降は小さいファイルだけを読めばよい）
                 try:
-                    img = Image.open(temp_path)
-                    img.verify()  # 画像が有効か検証
-                    img.close()
-                    # 再度開いてサイズを確認
                     with Image.open(temp_path) as img:
                         width, height = img.size
                         if width <= 0 or height <= 0:
                             logging.warning(f"無効な画像サイズ: {width}x{height}, ファイル: {safe_filename}")
-                            continue
-                        logging.info(f"画像サイズ: {width}x{height}, ファイル: {safe_filename}")
+                            return None
+                        if max(width, height) > _UPLOAD_MAX_EDGE:
+                            img.draft("RGB", (_UPLOAD_MAX_EDGE, _UPLOAD_MAX_EDGE))  # JPEGのデコードを縮小版で済ませるヒント
+                            img.thumbnail((_UPLOAD_MAX_EDGE, _UPLOAD_MAX_EDGE), Image.Resampling.BICUBIC)
+                            if file_ext != ".png" and img.mode in ("RGBA", "P"):
+                                img = img.convert("RGB")
+                            img.save(temp_path, quality=85)
+                            logging.info(f"画像を縮小して保存しました: {width}x{height} -> "
+                                         f"{img.size[0]}x{img.size[1]}, ファイル: {safe_filename}")
+                        else:
+                            img.load()
+                            logging.info(f"画像サイズ: {width}x{height}, ファイル: {safe_filename}")
                 except Exception as e:
                     logging.error(f"画像検証エラー ({safe_filename}): {str(e)}")
-                    continue
-                
-                # 成功した場合、パスをリストに追加（文字列として）
-                image_paths.append(str(temp_path))
+                    return None
+
                 logging.info(f"画像を保存しました: {original_filename} -> {safe_filename}")
-                
+                return str(temp_path)
+
             except Exception as e:
                 logging.error(f"画像アップロードエラー: {str(e)}")
-                import traceback
                 logging.error(traceback.format_exc())
-                continue
-        
-        return image_paths
+                return None
+
+        # 画像ファイルの保存・検証・縮小をスレッドプールで並列実行
+        # （PILのデコード・エンコードはCレベルでGILを解放するため並列化が効く。
+        # executor.mapは入力順を保って結果を返す）
+        with ThreadPoolExecutor(max_workers=min(8, len(uploaded_files))) as executor:
+            saved_paths = list(executor.map(_save_and_prep, uploaded_files))
+
+        return [path for path in saved_paths if path is not None]
         
     except Exception as e:
         logging.error(f"画像のアップロード全体でエラーが発生: {str(e)}")
-        import traceback
         logging.error(traceback.format_exc())
         return []
 
 
+@st.cache_resource(show_spinner=False)
 def get_api_key():
     """APIキーを取得する関数"""
     try:
@@ -1609,16 +1889,18 @@ def main():
     # セッションで保存した結果の読み込み
     results = get_session_value(SESSION_RESULTS, None)
     
-    # 処理ステージを管理（新しい処理の場合はリセット）
-    if uploaded_files and not get_session_value(SESSION_PROCESSING_STAGES, {}).get('processing_done', False):
-        set_session_value(SESSION_PROCESSING_STAGES, {
-            'processing_done': False,
-            'template_selection_done': False,
-            'results_display_done': False
-        })
-    
-    # 処理ステージのチェック
-    processing_stages = get_session_value(SESSION_PROCESSING_STAGES, {})
+    # 処理ステージのチェック（辞書はセッションに1つだけ確保し、以降は
+    # 再実行のたびに作り直さずフラグのみ書き換える）
+    processing_stages = st.session_state.setdefault(SESSION_PROCESSING_STAGES, {
+        'processing_done': False,
+        'template_selection_done': False,
+        'results_display_done': False
+    })
+
+    # 新しい処理の場合は後続ステージのフラグをリセット
+    if uploaded_files and not processing_stages.get('processing_done', False):
+        processing_stages['template_selection_done'] = False
+        processing_stages['results_display_done'] = False
     
     # ファイルがアップロードされていて、まだ処理されていない場合
     if uploaded_files and not processing_stages.get('processing_done', False):
@@ -1645,17 +1927,15 @@ def main():
                 display_progress()
                 
                 # 画像処理の実行
-                results = asyncio.run(process_images(processor, image_paths, stylists, coupons, use_cache))
+                results = _run_async(process_images(processor, image_paths, stylists, coupons, use_cache))
                 
                 # 結果をセッションに保存
                 set_session_value(SESSION_RESULTS, results)
                 
                 # 処理ステージを更新
-                set_session_value(SESSION_PROCESSING_STAGES, {
-                    'processing_done': True,
-                    'template_selection_done': False,
-                    'results_display_done': False
-                })
+                processing_stages['processing_done'] = True
+                processing_stages['template_selection_done'] = False
+                processing_stages['results_display_done'] = False
                 
                 # 処理後に進捗を更新（完了表示）
                 if has_session_key(SESSION_PROGRESS):
@@ -1675,11 +1955,8 @@ def main():
         # 選択が確定されたかチェック
         if get_session_value('confirm_template_selections', False):
             # 処理ステージを更新
-            set_session_value(SESSION_PROCESSING_STAGES, {
-                'processing_done': True,
-                'template_selection_done': True,
-                'results_display_done': False
-            })
+            processing_stages['template_selection_done'] = True
+            processing_stages['results_display_done'] = False
             # フラグをリセット
             set_session_value('confirm_template_selections', False)
             # ページのリロード
@@ -1692,11 +1969,7 @@ def main():
         
         # 処理ステージを更新
         if not processing_stages.get('results_display_done', False):
-            set_session_value(SESSION_PROCESSING_STAGES, {
-                'processing_done': True,
-                'template_selection_done': True,
-                'results_display_done': True
-            })
+            processing_stages['results_display_done'] = True
     
     # 初期状態（まだ画像がアップロードされていない）
     else:
@@ -1709,6 +1982,16 @@ def main():
             st.subheader("前回の処理結果")
             display_results(results)
 
+@st.cache_data(ttl=30, show_spinner=False)
+def _path_exists(path_str):
+    """ファイルの存在チェックをTTL付きでキャッシュする
+
+    check_app_statusは再実行のたびに呼ばれるため、statの発行を最大30秒に
+    1回に抑えます（低速なファイルシステムでの再実行コスト対策）。
+    """
+    return Path(path_str).exists()
+
+
 def check_app_status():
     """アプリケーションの状態を確認し、必要に応じて警告やエラーメッセージを表示する関数"""
     # APIキーの確認
@@ -1727,7 +2010,7 @@ def check_app_status():
     config_manager = get_config_manager()
     if config_manager:
         template_path = Path(config_manager.paths.template_csv)
-        if not template_path.exists():
+        if not _path_exists(str(template_path)):
             st.warning(f"テンプレートファイルが見つかりません: {template_path}")
             # テンプレートファイルがなくてもUIの表示は許可
     
@@ -5,6 +5,7 @@
 関数やメソッドのキャッシュを簡単に実装するためのユーティリティを提供します。
 """
 
+import asyncio
 import functools
 import logging
 from typing import Any, Callable, Optional, TypeVar, cast, Dict
@@ -49,22 +50,26 @@ def cacheable(cache_key_fn: CacheKeyFunction):
             if not should_use_cache:
                 return await func(self, *args, **kwargs)
             
-            # キャッシュキーの生成
-            cache_key = cache_key_fn(self, *args, **kwargs)
+            # キャッシュキーの生成（画像内容のダイジェスト計算などファイルIOを
+            # 伴う場合があるため、イベントループをブロックしないようワーカー
+            # スレッドで実行する）
+            cache_key = await asyncio.to_thread(cache_key_fn, self, *args, **kwargs)
             logger = logging.getLogger(__name__)
-            
+
             # キャッシュから結果を取得
             cached_result = self.cache_manager.get(cache_key)
             if cached_result is not None:
                 logger.debug(f"キャッシュヒット: {cache_key}")
                 return cast(T, cached_result)
-            
+
             # キャッシュにない場合は関数を実行
             result = await func(self, *args, **kwargs)
-            
+
             # 結果をキャッシュに保存（Noneでない場合のみ）
+            # キャッシュファイルへの書き込みはブロッキングIOのため、他の
+            # 並行タスクを止めないようワーカースレッドで実行する
             if result is not None:
-                self.cache_manager.set(cache_key, result)
+                await asyncio.to_thread(self.cache_manager.set, cache_key, result)
                 logger.debug(f"キャッシュに保存: {cache_key}")
             
             return result
@@ -33,6 +33,12 @@ from hairstyle_analyzer.data.models import (
     StyleFeatures
 )
 
+# st.expanderのモック用コンテキストマネージャー（__enter__/__exit__設定済み）
+_EXPANDER_CM = MagicMock()
+_EXPANDER_CM.__enter__ = MagicMock(return_value=MagicMock())
+_EXPANDER_CM.__exit__ = MagicMock(return_value=False)
+
+
 # Streamlitのモックを定義
 class StreamlitMock:
     """Streamlitのモッククラス"""
@@ -256,15 +262,7 @@ class TestStreamlitApp:
         monkeypatch.setattr(st, "dataframe", mock_dataframe)
         
         # 拡張パネルのモック
-        expander_mock = MagicMock()
-        
-        class ExpanderContextManager:
-            def __enter__(self):
-                return MagicMock()
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                return False
-        
-        expander_mock.return_value = ExpanderContextManager()
+        expander_mock = MagicMock(return_value=_EXPANDER_CM)
         monkeypatch.setattr(st, "expander", expander_mock)
         
         # カラムのモック
@@ -129,8 +129,8 @@ class TestTemplateSelection:
     @patch('streamlit.expander')
     @patch('streamlit.columns')
     @patch('streamlit.radio')
-    @patch('streamlit.button')
-    def test_template_selection_workflow(self, mock_button, mock_radio, mock_columns, 
+    @patch('streamlit.form_submit_button')
+    def test_template_selection_workflow(self, mock_submit, mock_radio, mock_columns, 
                                           mock_expander, mock_get_config, monkeypatch,
                                           mock_session_state, sample_process_result):
         """テンプレート選択ワークフローのテスト"""
@@ -154,8 +154,8 @@ class TestTemplateSelection:
         # ラジオボタンのモック（1番目の代替テンプレートを選択）
         mock_radio.return_value = 1
         
-        # ボタンのモック（確定ボタンを押す）
-        mock_button.return_value = True
+        # フォーム送信ボタンのモック（確定ボタンを押す）
+        mock_submit.return_value = True
         
         # 処理結果のリスト
         results = [sample_process_result]
@@ -2,18 +2,21 @@
 UIコンポーネントのテスト
 """
 
+import functools
+import hashlib
+import inspect
+import pickle
+import types
 import unittest
 import pytest
-from unittest.mock import patch, MagicMock, AsyncMock
+from unittest.mock import patch, MagicMock, DEFAULT
 import streamlit as st
-import pandas as pd
-import os
 from pathlib import Path
-import hairstyle_analyzer.ui.streamlit_app
 
 # テスト対象のモジュールをインポート
+# （from-importだけでモジュール本体もロードされるため、冗長な
+# import hairstyle_analyzer.ui.streamlit_app は置かない）
 from hairstyle_analyzer.ui.streamlit_app import (
-    init_session_state, 
     display_results,
     display_template_choices,
     display_progress,
@@ -23,17 +26,79 @@ from hairstyle_analyzer.ui.streamlit_app import (
     SESSION_PROGRESS,
     SESSION_PROCESSOR
 )
+from hairstyle_analyzer.core.processor import MainProcessor
+from hairstyle_analyzer.core.excel_exporter import ExcelExporter
+from hairstyle_analyzer.core.text_exporter import TextExporter
 from hairstyle_analyzer.data.models import (
-    ProcessResult, 
-    StyleAnalysis, 
-    AttributeAnalysis, 
-    Template, 
-    StylistInfo, 
-    CouponInfo, 
+    ProcessResult,
+    StyleAnalysis,
+    AttributeAnalysis,
+    Template,
+    StylistInfo,
+    CouponInfo,
     StyleFeatures
 )
 
+
+class _SS(dict):
+    """st.session_stateのモック用dict
+
+    本番コードは st.session_state["key"] と st.session_state.key の
+    両方のアクセス形式を使うため、属性アクセスをC実装のdict操作に
+    直結させた軽量サブクラスで両対応します。
+    """
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+
+
+# st.expanderのモック用コンテキストマネージャー。専用クラスを定義する
+# 代わりに、__enter__/__exit__を設定済みのMagicMockを1つだけ用意して
+# 全テストで使い回す。
+_EXPANDER_CM = MagicMock()
+_EXPANDER_CM.__enter__ = MagicMock(return_value=MagicMock())
+_EXPANDER_CM.__exit__ = MagicMock(return_value=False)
+
+# st.columnsのモック用カラムペア。テストはcall_countのみを検証し
+# カラム個別の呼び出し内容は見ないため、モジュールレベルで1組だけ
+# 生成して全テストで使い回す（MagicMockの生成コスト削減）。
+_COL_PAIR = (MagicMock(name="col1"), MagicMock(name="col2"))
+
+# 各テストでパッチするstreamlit関数名（まとめて適用する）
+_ST_MOCK_NAMES = [
+    "progress",
+    "write",
+    "columns",
+    "success",
+    "markdown",
+    "form_submit_button",
+    "dataframe",
+    "download_button",
+]
+
+
 @pytest.fixture
+def st_mocks(monkeypatch):
+    """streamlit関数のモックをまとめて適用するフィクスチャ
+
+    テストごとに@patchデコレータを積み重ねる代わりに、patch.multipleで
+    一括してパッチを適用し、SimpleNamespaceとしてモックを渡します。
+    パッチャーの適用・復元が1回ずつで済むため、テストあたりの
+    オーバーヘッドが小さくなります。
+    """
+    with patch.multiple("streamlit", **{name: DEFAULT for name in _ST_MOCK_NAMES}) as mocks:
+        ns = types.SimpleNamespace(**mocks)
+
+        # カラムのモック（2カラム構成を共通設定）
+        ns.columns.return_value = list(_COL_PAIR)
+
+        # エクスパンダーのモック
+        ns.expander = MagicMock(return_value=_EXPANDER_CM)
+        monkeypatch.setattr(st, "expander", ns.expander)
+
+        yield ns
+
+
+@pytest.fixture(scope="module")
 def mock_progress_data():
     """進捗データのモック"""
     return {
@@ -45,125 +110,141 @@ def mock_progress_data():
         "stage_details": "現在の処理: 画像分析中"
     }
 
-@pytest.fixture
-def sample_process_results():
-    """テスト用の処理結果サンプル"""
-    results = []
-    
-    # サンプル画像名
-    image_names = ["test1.jpg", "test2.jpg"]
-    
-    for img_name in image_names:
-        # スタイル分析の作成
-        style_analysis = StyleAnalysis(
-            category="ミディアムボブ",
-            features=StyleFeatures(
-                color="アッシュブラウン",
-                cut_technique="グラデーションカット",
-                styling="ナチュラルウェーブ",
-                impression="柔らかな印象"
-            ),
-            keywords=["ナチュラル", "ウェーブ", "ボブ"]
-        )
-        
-        # 属性分析の作成
-        attribute_analysis = AttributeAnalysis(
-            sex="レディース",
-            length="ミディアム"
-        )
-        
-        # テンプレートの作成
-        selected_template = Template(
-            category="ミディアムボブ",
-            title="ふんわりナチュラルミディアムボブ",
-            menu="カット+カラー",
-            comment="柔らかな質感が魅力的なナチュラルスタイル",
-            hashtag="#ナチュラル,#ミディアムボブ,#アッシュブラウン"
-        )
-        
-        # 代替テンプレートの作成
-        alternative_templates = [
-            Template(
-                category="ミディアムボブ",
-                title="大人かわいいウェーブボブ",
-                menu="カット+パーマ",
-                comment="ゆるふわパーマで動きのあるスタイル",
-                hashtag="#ゆるふわ,#ウェーブ,#大人かわいい"
-            )
-        ]
-        
-        # スタイリスト情報の作成
-        stylist = StylistInfo(
-            name="山田優子",
-            specialties="カット・カラーが得意",
-            description="10年のキャリアを持つ実力派スタイリスト"
-        )
-        
-        # クーポン情報の作成
-        coupon = CouponInfo(
-            name="平日限定カット+カラークーポン",
-            price=10000,
-            description="平日限定でお得なクーポン"
-        )
-        
-        # 処理結果の作成
-        result = ProcessResult(
-            image_name=img_name,
-            style_analysis=style_analysis,
-            attribute_analysis=attribute_analysis,
-            selected_template=selected_template,
-            alternative_templates=alternative_templates,
-            selected_stylist=stylist,
-            selected_coupon=coupon
+def _fixture_cache_version() -> str:
+    """サンプル結果のキャッシュバージョンを計算します。
+
+    モデルクラスのソースコードのハッシュをバージョンとすることで、
+    モデル定義が変わったときに古いpickleが自動的に無効化されます。
+    """
+    source = "".join(
+        inspect.getsource(cls)
+        for cls in (ProcessResult, StyleAnalysis, AttributeAnalysis,
+                    Template, StylistInfo, CouponInfo, StyleFeatures)
+    )
+    return hashlib.md5(source.encode("utf-8")).hexdigest()[:12]
+
+
+# サンプル結果の構成要素。モデルはすべてfrozenで不変なため、件数分の
+# ProcessResult間で同じインスタンスを安全に共有できる（ループ内での
+# 再構築・文字列/リストの再割り当てをなくす）。
+_SAMPLE_KEYWORDS = ("ナチュラル", "ウェーブ", "ボブ")
+
+_SAMPLE_STYLE_ANALYSIS = StyleAnalysis(
+    category="ミディアムボブ",
+    features=StyleFeatures(
+        color="アッシュブラウン",
+        cut_technique="グラデーションカット",
+        styling="ナチュラルウェーブ",
+        impression="柔らかな印象"
+    ),
+    keywords=list(_SAMPLE_KEYWORDS)
+)
+
+_SAMPLE_ATTRIBUTE_ANALYSIS = AttributeAnalysis(
+    sex="レディース",
+    length="ミディアム"
+)
+
+_SAMPLE_SELECTED_TEMPLATE = Template(
+    category="ミディアムボブ",
+    title="ふんわりナチュラルミディアムボブ",
+    menu="カット+カラー",
+    comment="柔らかな質感が魅力的なナチュラルスタイル",
+    hashtag="#ナチュラル,#ミディアムボブ,#アッシュブラウン"
+)
+
+_SAMPLE_ALTERNATIVE_TEMPLATES = (
+    Template(
+        category="ミディアムボブ",
+        title="大人かわいいウェーブボブ",
+        menu="カット+パーマ",
+        comment="ゆるふわパーマで動きのあるスタイル",
+        hashtag="#ゆるふわ,#ウェーブ,#大人かわいい"
+    ),
+)
+
+_SAMPLE_STYLIST = StylistInfo(
+    name="山田優子",
+    specialties="カット・カラーが得意",
+    description="10年のキャリアを持つ実力派スタイリスト"
+)
+
+_SAMPLE_COUPON = CouponInfo(
+    name="平日限定カット+カラークーポン",
+    price=10000,
+    description="平日限定でお得なクーポン"
+)
+
+
+@functools.lru_cache(maxsize=4)
+def _build_results(count: int = 2) -> tuple:
+    """処理結果サンプルを構築します。
+
+    テストはフィールドを読むだけで変更しないため、タプルで返して
+    プロセス内ではlru_cacheで件数ごとに1度だけ構築し、防御的コピー
+    なしで全テストに同じインスタンスを共有します。
+    件数ごとに変わるのはimage_nameのみで、残りの構成要素は
+    モジュールレベルの定数を使い回します。
+    """
+    return tuple(
+        ProcessResult(
+            image_name=f"test{i}.jpg",
+            style_analysis=_SAMPLE_STYLE_ANALYSIS,
+            attribute_analysis=_SAMPLE_ATTRIBUTE_ANALYSIS,
+            selected_template=_SAMPLE_SELECTED_TEMPLATE,
+            alternative_templates=list(_SAMPLE_ALTERNATIVE_TEMPLATES),
+            selected_stylist=_SAMPLE_STYLIST,
+            selected_coupon=_SAMPLE_COUPON
         )
-        
-        results.append(result)
-    
+        for i in range(1, count + 1)
+    )
+
+
+@pytest.fixture(scope="session")
+def sample_process_results(request):
+    """テスト用の処理結果サンプル
+
+    indirectパラメータで結果件数を指定できます（デフォルトは2件）。
+    モデルの構築とバリデーションを毎回やり直さないよう、構築結果を
+    .pytest_cache配下にpickleとして保存し、2回目以降はそこから読み込みます。
+    """
+    count = getattr(request, "param", 2)
+    cache_file = Path(request.config.cache.mkdir("ui_fixture")) / f"{_fixture_cache_version()}-{count}.pkl"
+    if cache_file.exists():
+        return pickle.loads(cache_file.read_bytes())
+
+    results = _build_results(count)
+    cache_file.write_bytes(pickle.dumps(results))
     return results
 
 class TestUIComponents:
     """UIコンポーネントのテストクラス"""
-    
-    @patch('streamlit.progress')
-    @patch('streamlit.write')
-    @patch('streamlit.columns')
-    @patch('streamlit.success')
-    @patch('streamlit.markdown')
-    def test_display_progress(self, mock_markdown, mock_success, mock_columns, 
-                              mock_write, mock_progress, monkeypatch, mock_progress_data):
-        """進捗表示のテスト"""
+
+    @pytest.mark.parametrize("complete,expect_success", [(False, False), (True, True)])
+    def test_display_progress(self, st_mocks, monkeypatch, mock_progress_data,
+                              complete, expect_success):
+        """進捗表示のテスト（処理中・完了の両状態）"""
         # セッション状態の設定
-        session_state = {
+        mock_progress_data["complete"] = complete
+        session_state = _SS({
             SESSION_PROGRESS: mock_progress_data
-        }
+        })
         monkeypatch.setattr(st, "session_state", session_state)
-        
-        # カラムのモック
-        mock_col1 = MagicMock()
-        mock_col2 = MagicMock()
-        mock_columns.return_value = [mock_col1, mock_col2]
-        
+
         # 進捗表示関数の実行
         display_progress()
-        
-        # プログレスバーが呼ばれたことを確認
-        assert mock_progress.call_count > 0
-        
-        # カラムが作成されていることを確認
-        assert mock_columns.call_count > 0
-        
-        # 完了メッセージが表示されていないことを確認（まだ完了していないため）
-        assert mock_success.call_count == 0
-        
-        # 完了状態に変更してテスト
-        session_state[SESSION_PROGRESS]["complete"] = True
-        display_progress()
-        
-        # 完了メッセージが表示されていることを確認
-        assert mock_success.call_count > 0
-    
-    @patch('streamlit.download_button')
-    def test_download_functionality(self, mock_download_button, monkeypatch):
+
+        # プログレスバーとカラムが呼ばれたことを確認
+        assert st_mocks.progress.called
+        assert st_mocks.columns.called
+
+        # 完了メッセージは完了状態のときのみ表示される
+        if expect_success:
+            assert st_mocks.success.called
+        else:
+            assert not st_mocks.success.called
+
+    def test_download_functionality(self, st_mocks):
         """ダウンロード機能のテスト"""
         # ダウンロードボタンが直接存在しない場合はテスト内でモック関数を定義
         def mock_download_excel(data):
@@ -176,120 +257,87 @@ class TestUIComponents:
                 file_name=filename,
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
             )
-        
+
         # モックデータ
         mock_excel_data = b'mock excel data'
-        
+
         # モック関数を呼び出し
         mock_download_excel(mock_excel_data)
-        
+
         # ダウンロードボタンが呼ばれたことを確認
-        assert mock_download_button.call_count > 0
-        
+        assert st_mocks.download_button.called
+
         # 適切なファイル形式が指定されていることを確認
-        args, kwargs = mock_download_button.call_args
+        args, kwargs = st_mocks.download_button.call_args
         assert 'excel' in kwargs.get('mime', '').lower() or 'spreadsheet' in kwargs.get('mime', '').lower()
-    
+
+    @pytest.mark.parametrize("sample_process_results", [2], indirect=True)
     @patch('hairstyle_analyzer.ui.streamlit_app.get_config_manager')
-    @patch('streamlit.columns')
-    @patch('streamlit.success')
-    @patch('streamlit.button')
-    def test_template_selection_confirmation(self, mock_button, mock_success, mock_columns, 
-                                             mock_get_config, sample_process_results, monkeypatch):
+    def test_template_selection_confirmation(self, mock_get_config, st_mocks,
+                                             sample_process_results, monkeypatch):
         """テンプレート選択の確定機能のテスト"""
         # セッション状態のセットアップ
-        session_state = {
+        session_state = _SS({
             SESSION_TEMPLATE_CHOICES: {},
             SESSION_USER_SELECTIONS: {},
             SESSION_RESULTS: sample_process_results
-        }
+        })
         monkeypatch.setattr(st, "session_state", session_state)
-        
+
         # ConfigManagerのモック
         mock_config = MagicMock()
         mock_config.paths.image_folder = "assets/samples"
         mock_get_config.return_value = mock_config
-        
-        # ボタンのモック（確定ボタンを押す）
-        mock_button.return_value = True
-        
-        # エクスパンダーのモック
-        expander_mock = MagicMock()
-        
-        class ExpanderContextManager:
-            def __enter__(self):
-                return MagicMock()
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                return False
-        
-        expander_mock.return_value = ExpanderContextManager()
-        monkeypatch.setattr(st, "expander", expander_mock)
-        
-        # カラムのモック
-        mock_col1 = MagicMock()
-        mock_col2 = MagicMock()
-        mock_columns.return_value = [mock_col1, mock_col2]
-        
+
+        # フォーム送信ボタンのモック（確定ボタンを押す）
+        st_mocks.form_submit_button.return_value = True
+
         # テンプレート選択肢表示関数の実行
         display_template_choices(sample_process_results)
-        
+
         # 成功メッセージが表示されたことを確認
-        assert mock_success.call_count > 0
-        
+        assert st_mocks.success.called
+
         # 確定フラグがセットされていることを確認
         assert 'confirm_template_selections' in st.session_state
         assert st.session_state['confirm_template_selections'] == True
-    
+
+    @pytest.mark.parametrize("sample_process_results", [1], indirect=True)
     @patch('hairstyle_analyzer.ui.streamlit_app.get_config_manager')
-    @patch('streamlit.dataframe')
-    @patch('streamlit.columns')
-    @patch('streamlit.download_button')
-    def test_display_results_buttons(self, mock_download_button, mock_columns, mock_dataframe, mock_get_config, sample_process_results, monkeypatch):
+    def test_display_results_buttons(self, mock_get_config, st_mocks, sample_process_results, monkeypatch):
         """結果表示画面のボタンテスト"""
+        # プロセッサーのモック（spec指定で子モックの自動生成を抑え、
+        # 実クラスに存在しない属性へのアクセスを検出できるようにする）
+        processor_mock = MagicMock(spec=MainProcessor)
+        processor_mock.excel_exporter = MagicMock(spec=ExcelExporter)
+        processor_mock.text_exporter = MagicMock(spec=TextExporter)
+        processor_mock.excel_exporter.get_binary_data.return_value = b"mock excel data"
+        processor_mock.text_exporter.get_text_content.return_value = "mock text data"
+
         # セッション状態のセットアップ
-        session_state = {
-            SESSION_PROCESSOR: MagicMock(),
+        session_state = _SS({
+            SESSION_PROCESSOR: processor_mock,
             SESSION_RESULTS: sample_process_results
-        }
-        processor_mock = session_state[SESSION_PROCESSOR]
-        processor_mock.excel_exporter.get_binary_data.return_value = b"mock excel data"
-        processor_mock.text_exporter.get_text.return_value = "mock text data"
-        
+        })
+
         monkeypatch.setattr(st, "session_state", session_state)
-        
+
         # ConfigManagerのモック
         mock_config = MagicMock()
         mock_config.paths.image_folder = "assets/samples"
         mock_get_config.return_value = mock_config
-        
-        # エクスパンダーのモック
-        expander_mock = MagicMock()
-        
-        class ExpanderContextManager:
-            def __enter__(self):
-                return MagicMock()
-            def __exit__(self, exc_type, exc_val, exc_tb):
-                return False
-        
-        expander_mock.return_value = ExpanderContextManager()
-        monkeypatch.setattr(st, "expander", expander_mock)
-        
-        # カラムのモック
-        mock_col1 = MagicMock()
-        mock_col2 = MagicMock()
-        mock_columns.return_value = [mock_col1, mock_col2]
-        
+
         # ダウンロードボタンのモック
-        mock_download_button.return_value = True
-        
+        st_mocks.download_button.return_value = True
+
         # 結果表示関数の実行
         display_results(sample_process_results)
-        
+
         # ダウンロードボタンが呼ばれたことを確認
-        assert mock_download_button.call_count > 0
-        
+        assert st_mocks.download_button.called
+
         # データフレームが呼ばれたことを確認
-        assert mock_dataframe.call_count > 0
+        assert st_mocks.dataframe.called
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    unittest.main()